@@ -20,10 +20,17 @@ def create_app(config_name: str = None):
     max_mb = app.config.get("MAX_UPLOAD_MB", 5)
     app.config["MAX_CONTENT_LENGTH"] = max_mb * 1024 * 1024
 
+    # Pool sizing/timeouts from config; an explicit SQLALCHEMY_ENGINE_OPTIONS wins
+    from .db_pool import engine_options
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
+
     # Extensions
     db.init_app(app)
     bcrypt.init_app(app)
     mail.init_app(app)
+    from . import observability, profiling
+    observability.init_app(app)
+    profiling.init_app(app)
 
     # CORS - FIXED VERSION
     origins = app.config.get("CORS_ALLOW_ORIGINS", ["*"])
@@ -32,6 +39,7 @@ def create_app(config_name: str = None):
         resources={r"/api/*": {"origins": origins}},
         supports_credentials=True,
         allow_headers=["Content-Type", "Authorization"],
+        expose_headers=["X-Next-Cursor"],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"]
     )
 
@@ -47,8 +55,16 @@ def create_app(config_name: str = None):
         app.register_blueprint(payments_bp, url_prefix="/api/payments")
         app.register_blueprint(user_bp, url_prefix="/api/user")
 
+        from . import jobs, question_bank
+        jobs.register_cli(app)
+        question_bank.register_cli(app)
+
     @app.get("/api/health")
     def health():
         return jsonify({"ok": True}), 200
 
+    @app.get("/api/metrics")
+    def metrics_snapshot():
+        return observability.metrics_response(), 200
+
     return app
\ No newline at end of file
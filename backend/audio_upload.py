@@ -0,0 +1,192 @@
+"""
+Chunked audio uploads.
+
+The client streams the answer as raw binary chunks while the candidate speaks:
+
+    POST /api/interviews/audio-chunk?session_id=<uuid>&turn_no=<n>&offset=<bytes sent so far>[&final=1&ext=webm]
+
+Each chunk is appended to a spool file on disk in 64KB reads, so a request never
+holds more than one read buffer in memory. `offset` makes retries safe: a chunk
+whose offset doesn't match the spooled size is rejected with the current size.
+On the final chunk the file is finalized and transcription starts in the
+background, so it usually finishes before /submit-answer asks for it.
+
+Uploads that are never finished or never submitted (tab closed mid-answer) are
+removed by a sweep, run from append_chunk at most once per SWEEP_INTERVAL, of
+spool files untouched for AUDIO_SPOOL_MAX_AGE_SECONDS.
+"""
+import os
+import glob
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; concurrent chunks for one turn are then not serialised
+    fcntl = None
+
+from .stt_pool import TranscriptionBusy
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+ALLOWED_EXTENSIONS = {'webm', 'ogg', 'wav', 'mp3', 'm4a', 'flac'}
+SWEEP_INTERVAL = 300  # seconds between sweeps, per process
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, size=None):
+        super().__init__(message)
+        self.status = status
+        self.size = size
+
+_lock = threading.Lock()
+_executor = None
+_transcripts = {}  # final audio path -> Future[str]
+_next_sweep = 0.0
+
+def spool_dir():
+    path = current_app.config.get('AUDIO_SPOOL_DIR') or os.path.join(tempfile.gettempdir(), 'aic_audio')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _base(session_id, turn_no):
+    # session_id is a validated UUID and turn_no an int, so this is safe as a filename
+    return os.path.join(spool_dir(), f"{session_id}_{int(turn_no)}")
+
+def sweep(max_age=None):
+    """Deletes spool files (partial or finalized) not written for max_age seconds; returns how many."""
+    if max_age is None:
+        max_age = current_app.config.get('AUDIO_SPOOL_MAX_AGE_SECONDS', 3600)
+    cutoff = time.time() - max_age
+    with _lock:
+        active = set(_transcripts)
+    removed = 0
+    for entry in os.scandir(spool_dir()):
+        try:
+            if entry.is_file() and entry.path not in active and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass  # finalized or removed by another worker meanwhile
+    if removed:
+        logger.info(f"Removed {removed} abandoned audio upload(s)")
+    return removed
+
+def _maybe_sweep():
+    global _next_sweep
+    now = time.monotonic()
+    with _lock:
+        if now < _next_sweep:
+            return
+        _next_sweep = now + SWEEP_INTERVAL
+    try:
+        sweep()
+    except OSError as e:
+        logger.warning(f"Audio spool sweep failed: {e}")
+
+@contextmanager
+def _locked_part(part_path):
+    """
+    The spool file opened for appending, under an exclusive lock (across threads and
+    workers) so one chunk at a time checks the size and writes. A chunk arriving while
+    another is being written gets 409 rather than waiting for it.
+    """
+    with open(part_path, 'ab') as fh:
+        if fcntl is not None:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError('Another chunk for this turn is still being uploaded.', status=409,
+                                  size=os.fstat(fh.fileno()).st_size)
+            try:
+                current = os.stat(part_path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(fh.fileno()).st_ino:
+                # finalized (renamed) between our open and our lock; don't append to the finished file
+                raise UploadError('The upload for this turn was already finalized.', status=409)
+        yield fh  # closing the file releases the lock
+
+def append_chunk(session_id, turn_no, offset, stream):
+    """Appends the request body to the spool file; returns the new total size."""
+    _maybe_sweep()
+    part_path = _base(session_id, turn_no) + '.part'
+    max_bytes = current_app.config.get('MAX_AUDIO_UPLOAD_MB', 25) * 1024 * 1024
+
+    with _locked_part(part_path) as fh:
+        # sized under the lock: a retried chunk that raced the original sees its bytes
+        size = os.fstat(fh.fileno()).st_size
+        if offset != size:
+            raise UploadError('Chunk offset does not match uploaded size.', status=409, size=size)
+        while True:
+            block = stream.read(READ_SIZE)
+            if not block:
+                break
+            size += len(block)
+            if size > max_bytes:
+                fh.truncate(offset)
+                raise UploadError('Audio upload too large.', status=413, size=offset)
+            fh.write(block)
+    return size
+
+def finalize(session_id, turn_no, ext):
+    """Closes the upload and starts transcribing it in the background; returns the audio path."""
+    ext = (ext or 'webm').lower().lstrip('.')
+    if ext not in ALLOWED_EXTENSIONS:
+        raise UploadError('Unsupported audio format.')
+    base = _base(session_id, turn_no)
+    if not os.path.exists(base + '.part'):
+        raise UploadError('No audio uploaded for this turn.', status=404)
+    final_path = f"{base}.{ext}"
+    with _locked_part(base + '.part'):
+        os.replace(base + '.part', final_path)
+
+    app = current_app._get_current_object()
+    with _lock:
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=current_app.config.get('STT_BACKGROUND_WORKERS', 2),
+                                           thread_name_prefix='stt')
+        _transcripts[final_path] = _executor.submit(_transcribe, app, final_path)
+    return final_path
+
+def _transcribe(app, path):
+    from . import services
+    with app.app_context():
+        return services.transcribe_audio_file(path)
+
+def find_upload(session_id, turn_no):
+    """Path of the finalized upload for a turn, or None."""
+    base = _base(session_id, turn_no)
+    for path in glob.glob(base + '.*'):
+        if not path.endswith('.part'):
+            return path
+    return None
+
+def take_transcript(path):
+    """
+    Transcript for a finalized upload: the background result when this process
+    started one, otherwise transcribed now (e.g. the final chunk hit another worker).
+    """
+    from . import services
+    with _lock:
+        future = _transcripts.pop(path, None)
+    if future is not None:
+        try:
+            return future.result(timeout=current_app.config.get('STT_TIMEOUT_SECONDS', 60))
+        except TranscriptionBusy:
+            pass  # the pool was full when the final chunk arrived; try again now
+        except Exception as e:
+            logger.error(f"Background transcription failed for {path}: {e}")
+    return services.transcribe_audio_file(path)
+
+def discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -24,20 +24,128 @@ class Config:
 
     # API Keys
     GEMINI_KEYS = [key.strip() for key in os.getenv('GEMINI_KEYS', '').split(',') if key.strip()]
+    # Key scheduler (see backend/key_pool.py). State is shared by workers via a sqlite file unless 'memory'.
+    GEMINI_KEY_STATE = os.getenv('GEMINI_KEY_STATE', 'sqlite').lower()
+    GEMINI_KEY_STATE_PATH = os.getenv('GEMINI_KEY_STATE_PATH')  # defaults to the system temp dir
+    GEMINI_KEY_RPM = float(os.getenv('GEMINI_KEY_RPM', '60'))
+    GEMINI_KEY_BURST = float(os.getenv('GEMINI_KEY_BURST', '10'))
+    GEMINI_KEY_COOLDOWN_SECONDS = float(os.getenv('GEMINI_KEY_COOLDOWN_SECONDS', '5'))
+    GEMINI_KEY_WAIT_SECONDS = float(os.getenv('GEMINI_KEY_WAIT_SECONDS', '2'))
+    # keys free-tier users may draw from (the first N of GEMINI_KEYS); 0 = all of them
+    GEMINI_FREE_KEY_COUNT = int(os.getenv('GEMINI_FREE_KEY_COUNT', '0'))
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+    # Process cache of the authenticated user (0 = off; keep short, it is per worker)
+    USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '0'))
+
+    # Database connection pool, per worker process (see backend/db_pool.py). Size it to the
+    # worker's threads; workers x (size + overflow) must stay under Postgres max_connections.
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT_SECONDS = float(os.getenv('DB_POOL_TIMEOUT_SECONDS', '30'))
+    DB_POOL_RECYCLE_SECONDS = int(os.getenv('DB_POOL_RECYCLE_SECONDS', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('true', '1', 'yes')
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))  # 0 = no limit
+
+    # Outbound HTTP (pooled keep-alive session shared by Gemini + JD fetches)
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '4'))  # distinct hosts kept warm
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))  # connections per host
+    HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'true').lower() in ('true', '1', 'yes')
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '2'))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.3'))
+    HTTP_BACKOFF_JITTER = float(os.getenv('HTTP_BACKOFF_JITTER', '0.2'))
+
+    # Speculative next-question generation (see backend/prefetch.py)
+    PREFETCH_NEXT_QUESTION = os.getenv('PREFETCH_NEXT_QUESTION', 'false').lower() in ('true', '1', 'yes')
+    PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', '4'))
+    PREFETCH_WAIT_SECONDS = float(os.getenv('PREFETCH_WAIT_SECONDS', '5'))
+    PREFETCH_TTL_SECONDS = int(os.getenv('PREFETCH_TTL_SECONDS', '900'))
+
+    # LLM response cache (see backend/llm_cache.py): none | memory | sqlite
+    LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', 'memory').lower()
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH')  # sqlite file; defaults to the system temp dir
+    LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', '86400'))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1000'))
+
+    # JD pages fetched for /prepare (see backend/jd_fetch.py)
+    JD_CACHE_PATH = os.getenv('JD_CACHE_PATH')  # sqlite file; defaults to the system temp dir
+    JD_CACHE_FRESH_SECONDS = int(os.getenv('JD_CACHE_FRESH_SECONDS', '3600'))
+    JD_CACHE_MAX_ENTRIES = int(os.getenv('JD_CACHE_MAX_ENTRIES', '2000'))
+    JD_FETCH_MAX_BYTES = int(os.getenv('JD_FETCH_MAX_BYTES', str(2 * 1024 * 1024)))
+    JD_FETCH_TIMEOUT_SECONDS = float(os.getenv('JD_FETCH_TIMEOUT_SECONDS', '15'))
+
+    # Coalesce concurrent identical LLM work (see backend/single_flight.py); the DB lock
+    # extends it across workers with a lease row that expires after SINGLE_FLIGHT_LEASE_SECONDS
+    SINGLE_FLIGHT_DB_LOCK = os.getenv('SINGLE_FLIGHT_DB_LOCK', 'false').lower() in ('true', '1', 'yes')
+    SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv('SINGLE_FLIGHT_TIMEOUT_SECONDS', '60'))
+    SINGLE_FLIGHT_LEASE_SECONDS = float(os.getenv('SINGLE_FLIGHT_LEASE_SECONDS', '120'))
+
+    # A turn left 'generating' this long (worker died mid-request) can be claimed again
+    TURN_CLAIM_STALE_SECONDS = int(os.getenv('TURN_CLAIM_STALE_SECONDS', '180'))
+
+    # Prompt token budgets (estimated tokens, see backend/prompt_budget.py)
+    PROMPT_BUDGET_TRANSCRIPT_TOKENS = int(os.getenv('PROMPT_BUDGET_TRANSCRIPT_TOKENS', '6000'))
+    PROMPT_BUDGET_DOCUMENT_TOKENS = int(os.getenv('PROMPT_BUDGET_DOCUMENT_TOKENS', '4000'))
+
+    # History pagination
+    HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '50'))
+    HISTORY_MAX_PAGE_SIZE = int(os.getenv('HISTORY_MAX_PAGE_SIZE', '100'))
+
+    # Background jobs (final feedback, post-session suggestions); needs `flask jobs-worker` running.
+    # /get-feedback then answers 202 {status, job_id} until the report is ready, so its client must
+    # poll /interviews/jobs/<id> and ask again (the web app has no /get-feedback caller yet)
+    BACKGROUND_JOBS = os.getenv('BACKGROUND_JOBS', 'false').lower() in ('true', '1', 'yes')
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    JOB_RETRY_BASE_SECONDS = int(os.getenv('JOB_RETRY_BASE_SECONDS', '10'))
+    JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv('JOB_LOCK_TIMEOUT_SECONDS', '600'))
+    JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '2'))
+
     # Razorpay
     RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID')
     RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET')
 
     # Uploads / Storage
     MAX_UPLOAD_MB = int(os.getenv('MAX_UPLOAD_MB', '5'))
+    # chunked audio uploads: each chunk is bounded by MAX_UPLOAD_MB, the whole answer by this
+    MAX_AUDIO_UPLOAD_MB = int(os.getenv('MAX_AUDIO_UPLOAD_MB', '25'))
+    AUDIO_SPOOL_DIR = os.getenv('AUDIO_SPOOL_DIR')  # defaults to <tmp>/aic_audio
+    AUDIO_SPOOL_MAX_AGE_SECONDS = int(os.getenv('AUDIO_SPOOL_MAX_AGE_SECONDS', '3600'))  # abandoned uploads
+    STT_BACKGROUND_WORKERS = int(os.getenv('STT_BACKGROUND_WORKERS', '2'))
+    STT_TIMEOUT_SECONDS = int(os.getenv('STT_TIMEOUT_SECONDS', '60'))
+
+    # Speech-to-text process pool (0 workers = run inline on the request thread)
+    STT_POOL_SIZE = int(os.getenv('STT_POOL_SIZE', '2'))
+    STT_POOL_QUEUE = int(os.getenv('STT_POOL_QUEUE', '4'))  # jobs allowed to wait beyond the pool size
+    STT_POOL_START_METHOD = os.getenv('STT_POOL_START_METHOD', 'spawn')
+    STT_RETRY_AFTER_SECONDS = int(os.getenv('STT_RETRY_AFTER_SECONDS', '2'))
     USE_GCS = os.getenv('USE_GCS', 'false').lower() in ('true', '1', 'yes')
     GCS_BUCKET = os.getenv('GCS_BUCKET')
     GOOGLE_APPLICATION_CREDENTIALS = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
 
+    # Near-duplicate question guard (character 5-gram Jaccard against the user's past questions)
+    DUPLICATE_QUESTION_THRESHOLD = float(os.getenv('DUPLICATE_QUESTION_THRESHOLD', '0.6'))
+    QUESTION_INDEX_MAX_USERS = int(os.getenv('QUESTION_INDEX_MAX_USERS', '500'))
+
+    # Curated question bank (see backend/question_bank.py): share of conversation turns served
+    # from the bank instead of Gemini (0 = off). Also switches the greeting to a template.
+    QUESTION_BANK_RATIO = float(os.getenv('QUESTION_BANK_RATIO', '0'))
+    QUESTION_BANK_RELOAD_SECONDS = int(os.getenv('QUESTION_BANK_RELOAD_SECONDS', '300'))
+
+    # Answer analysis lexicon (fillers + pronunciation terms); defaults to backend/data/lexicon.json
+    LEXICON_PATH = os.getenv('LEXICON_PATH')
+
     # Observability (optional)
     SENTRY_DSN = os.getenv('SENTRY_DSN')
+    # /api/metrics adds up every worker's metrics through this directory (unset: per process only);
+    # use a per-deploy path, e.g. under /run
+    METRICS_DIR = os.getenv('METRICS_DIR')
+    METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+    # Per-request profiling (see backend/profiling.py): off unless a token or sample rate is set.
+    # Send `X-Profile: <PROFILE_TOKEN>` to profile one request.
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_ENGINE = os.getenv('PROFILE_ENGINE', 'cprofile').lower()  # cprofile | pyinstrument | none
+    PROFILE_DIR = os.getenv('PROFILE_DIR')  # defaults to the system temp dir
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,118 @@
+"""
+Interview credit accounting.
+
+Every balance change is a single conditional UPDATE ... RETURNING, so the
+check and the change happen in one statement: concurrent starts can't both
+spend the last credit, a refund can't happen twice, and a payment confirmed by
+both /verify-payment and the webhook grants credits once. Nothing here reads a
+balance into Python first, so row locks last one statement and are released by
+the caller's commit, which should come before any LLM call.
+
+Functions take effect in the current session; the caller commits.
+"""
+import logging
+from sqlalchemy import update
+
+from .app import db
+from .models import User, Interview, Payment
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_BALANCE = {'free': User.free_interviews_remaining, 'paid': User.paid_interviews_remaining}
+
+def _change(user_id, credit_type, delta):
+    column = _BALANCE[credit_type]
+    stmt = update(User).where(User.id == user_id)
+    if delta < 0:
+        stmt = stmt.where(column >= -delta)
+    row = db.session.execute(
+        stmt.values({column: column + delta})
+        .returning(User.free_interviews_remaining, User.paid_interviews_remaining)
+    ).first()
+    return (row[0], row[1]) if row else None
+
+def consume(user_id):
+    """Spends one credit, free before paid. Returns 'free' | 'paid', or None if the user has none."""
+    for credit_type in ('free', 'paid'):
+        if _change(user_id, credit_type, -1) is not None:
+            metrics.incr(f'credits_consumed_{credit_type}')
+            return credit_type
+    metrics.incr('credits_insufficient')
+    return None
+
+def refund(user_id, credit_type):
+    """Returns one credit of credit_type; returns the new (free, paid) balances."""
+    metrics.incr('credits_refunded')
+    return _change(user_id, credit_type, 1)
+
+def grant(user_id, credits):
+    """Adds paid credits; returns the new (free, paid) balances."""
+    return _change(user_id, 'paid', credits)
+
+def start_interview(interview_id, user_id):
+    """
+    Moves a 'created' interview to 'started' and charges it exactly once.
+    Returns the credit type used, 'already_started' if it was charged earlier,
+    or None when the user has no credits (the interview stays 'created').
+    """
+    claimed = db.session.execute(
+        update(Interview)
+        .where(Interview.id == interview_id, Interview.user_id == user_id, Interview.status == 'created')
+        .values(status='started')
+        .returning(Interview.id)
+    ).first()
+    if not claimed:
+        return 'already_started'
+    credit_type = consume(user_id)
+    if credit_type is None:
+        db.session.execute(update(Interview).where(Interview.id == interview_id).values(status='created'))
+        return None
+    db.session.execute(update(Interview).where(Interview.id == interview_id).values(credit_type_used=credit_type))
+    return credit_type
+
+def cancel_interview(interview_id, user_id):
+    """
+    Cancels a created/started interview, refunding a started one's credit once.
+    A turn still generating is cancelled too; its interview_state.finish() then fails.
+    Returns 'refunded', 'cancelled', or None if it can no longer be cancelled.
+    """
+    row = db.session.execute(
+        update(Interview)
+        .where(Interview.id == interview_id, Interview.user_id == user_id,
+               Interview.status.in_(('started', 'generating')))
+        .values(status='cancelled', turn_claimed_at=None)
+        .returning(Interview.credit_type_used)
+    ).first()
+    if row:
+        if row[0] in _BALANCE:
+            refund(user_id, row[0])
+            return 'refunded'
+        return 'cancelled'
+    row = db.session.execute(
+        update(Interview)
+        .where(Interview.id == interview_id, Interview.user_id == user_id, Interview.status == 'created')
+        .values(status='cancelled')
+        .returning(Interview.id)
+    ).first()
+    return 'cancelled' if row else None
+
+def apply_payment(razorpay_order_id, razorpay_payment_id, credits, raw_payload=None):
+    """
+    Marks the order paid and grants its credits, once. Returns (user_id, paid_remaining),
+    or None if the order is unknown or was already paid.
+    """
+    values = {'status': 'paid', 'razorpay_payment_id': razorpay_payment_id, 'signature_ok': True}
+    if raw_payload is not None:
+        values['raw_payload'] = raw_payload
+    row = db.session.execute(
+        update(Payment)
+        .where(Payment.razorpay_order_id == razorpay_order_id, Payment.status != 'paid')
+        .values(values)
+        .returning(Payment.user_id)
+    ).first()
+    if not row:
+        return None
+    _, paid = grant(row[0], credits)
+    metrics.incr('credits_granted', credits)
+    return row[0], paid
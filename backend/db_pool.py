@@ -0,0 +1,66 @@
+"""
+SQLAlchemy engine options from config, and connection pool instrumentation.
+
+Each worker process has its own pool: DB_POOL_SIZE should cover the worker's
+request threads, and workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) (plus job and
+prefetch threads) has to stay under Postgres max_connections.
+
+InstrumentedQueuePool records how long each checkout waited for a connection
+(`db_pool_checkout_seconds`), checkouts that had to open an overflow connection,
+and checkouts that gave up after DB_POOL_TIMEOUT. In-use / idle / overflow
+connection gauges are read from the pool when metrics are collected.
+"""
+import time
+import logging
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+class InstrumentedQueuePool(QueuePool):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # the newest pool wins (engine.dispose() replaces the pool with a recreated one)
+        metrics.gauge('db_pool_size', self.size)
+        metrics.gauge('db_pool_checked_out', self.checkedout)
+        metrics.gauge('db_pool_idle', self.checkedin)
+        # overflow() counts up from -pool_size as connections are first opened
+        metrics.gauge('db_pool_overflow', lambda: max(0, self.overflow()))
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            metrics.incr('db_pool_timeouts')
+            logger.warning(f"DB pool exhausted: {self.status()}")
+            raise
+        finally:
+            metrics.observe('db_pool_checkout_seconds', time.perf_counter() - started, CHECKOUT_BUCKETS)
+        if self.overflow() > max(0, overflow):
+            metrics.incr('db_pool_overflow_checkouts')
+        return entry
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for config's database (sqlite keeps Flask-SQLAlchemy's defaults)."""
+    uri = config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if not uri or uri.startswith('sqlite'):
+        return {}
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT_SECONDS', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE_SECONDS', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+    }
+    statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+    if statement_timeout and uri.startswith('postgres'):
+        options['connect_args'] = {'options': f"-c statement_timeout={int(statement_timeout)}"}
+    return options
@@ -0,0 +1,68 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import current_app, has_app_context
+
+from . import profiling
+
+# Retried transparently by the adapter. 429 is deliberately absent: call_gemini
+# handles it itself by rotating to another key.
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+def _setting(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+def _build_session():
+    retry = Retry(
+        total=_setting('HTTP_RETRIES', 2),
+        backoff_factor=_setting('HTTP_BACKOFF_FACTOR', 0.3),
+        backoff_jitter=_setting('HTTP_BACKOFF_JITTER', 0.2),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'POST'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=_setting('HTTP_POOL_CONNECTIONS', 4),
+        pool_maxsize=_setting('HTTP_POOL_MAXSIZE', 16),
+        pool_block=_setting('HTTP_POOL_BLOCK', True),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    # spans for profiled requests (a no-op otherwise)
+    session.hooks['response'].append(profiling.record_http)
+    return session
+
+def get_session() -> requests.Session:
+    """
+    Shared keep-alive session for outbound HTTP (Gemini, JD fetches).
+    One per process: gunicorn forks after import, and a pool inherited across
+    fork would share sockets with the parent, so we rebuild when the pid changes.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+def reset_session():
+    """Drop the pooled session (e.g. after config changes in tests or benchmarks)."""
+    global _session, _session_pid
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
@@ -0,0 +1,88 @@
+"""
+Interview lifecycle and the per-turn claim.
+
+    created --start--> started --claim--> generating --finish--> started | completed
+    created | started | generating --cancel--> cancelled
+
+Producing a turn (start, submit-answer, skip) takes seconds of STT and Gemini
+I/O, so the routes run it in phases and never hold a pooled connection across it:
+1. claim(): one conditional UPDATE started -> generating, committed at once.
+   A second submission for the same interview finds it 'generating' (409).
+2. detach(): load what the slow phase reads, then close the session. The
+   objects stay usable, detached, and the connection goes back to the pool.
+3. STT / Gemini, with no transaction open.
+4. write() / finish(): short transactions that only apply while the claim is
+   still ours, so a cancel (or a takeover of a stale claim) during step 3 wins.
+
+A claim older than TURN_CLAIM_STALE_SECONDS (the worker died mid-turn) can be
+taken over. Like backend/credits.py, functions act in the current session and
+the caller commits.
+"""
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import update, or_, and_
+
+from .app import db
+from .models import Interview, InterviewTurn
+from . import metrics
+
+def claim(interview_id, user_id):
+    """
+    Moves a started interview to 'generating'. Returns the claim token (pass it to
+    write/finish/release), or None; status() then tells the caller why.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=current_app.config.get('TURN_CLAIM_STALE_SECONDS', 180))
+    row = db.session.execute(
+        update(Interview)
+        .where(Interview.id == interview_id, Interview.user_id == user_id,
+               or_(Interview.status == 'started',
+                   and_(Interview.status == 'generating', Interview.turn_claimed_at < stale_before)))
+        .values(status='generating', turn_claimed_at=now)
+        .returning(Interview.id)
+    ).first()
+    if not row:
+        metrics.incr('turn_claims_rejected')
+        return None
+    return now
+
+def status(interview_id, user_id):
+    """The interview's status, or None if it doesn't exist or isn't the user's."""
+    return (db.session.query(Interview.status)
+            .filter(Interview.id == interview_id, Interview.user_id == user_id)
+            .scalar())
+
+def _claimed(interview_id, token):
+    return update(Interview).where(Interview.id == interview_id, Interview.status == 'generating',
+                                   Interview.turn_claimed_at == token)
+
+def write(interview_id, token, **values):
+    """Updates the interview only while the claim is held. Returns False if it was lost."""
+    row = db.session.execute(_claimed(interview_id, token).values(**values).returning(Interview.id)).first()
+    return row is not None
+
+def finish(interview_id, token, status='started', **values):
+    """Ends the turn: generating -> status ('started' or 'completed'). False if the claim was lost."""
+    return write(interview_id, token, status=status, turn_claimed_at=None, **values)
+
+def release(interview_id, token):
+    """Gives the claim back without producing a turn (the slow phase failed)."""
+    return finish(interview_id, token)
+
+def update_turn(turn_id, **values):
+    db.session.execute(update(InterviewTurn).where(InterviewTurn.id == turn_id).values(**values))
+
+def detach(interview):
+    """
+    Loads what prompt building and STT read (context, user, JD, last turn) and closes
+    the session, returning its connection to the pool. Returns the last turn.
+    """
+    from . import services
+    services.ensure_context(interview)
+    interview.user, interview.job_description
+    last_turn = (InterviewTurn.query
+                 .filter_by(interview_id=interview.id)
+                 .order_by(InterviewTurn.turn_no.desc())
+                 .first())
+    db.session.close()
+    return last_turn
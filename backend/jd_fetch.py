@@ -0,0 +1,248 @@
+"""
+Job description ingestion for /prepare?jd_url=...
+
+Pages are read as a stream (capped at JD_FETCH_MAX_BYTES) straight into an
+HTMLParser-based extractor that drops script/style/nav/footer content and keeps
+block structure as line breaks. A schema.org JobPosting description in JSON-LD
+is preferred when the page has one.
+
+Extracted text is cached on disk (sqlite, shared by workers) keyed by the
+normalised URL (tracking parameters dropped, query sorted), with the response's
+ETag / Last-Modified. The page itself is always fetched from the URL as given. Within JD_CACHE_FRESH_SECONDS an entry
+is served without touching the network; after that it is revalidated with a
+conditional GET, and a stale entry is still served if the site is down.
+"""
+import os
+import re
+import json
+import time
+import codecs
+import sqlite3
+import logging
+import tempfile
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from flask import current_app, has_app_context
+
+from . import metrics
+from .http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+SKIP_TAGS = frozenset({'script', 'style', 'noscript', 'template', 'svg', 'head', 'nav', 'footer',
+                       'form', 'button', 'iframe', 'select', 'aside'})
+BLOCK_TAGS = frozenset({'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'tr', 'table',
+                        'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'hr', 'dd', 'dt', 'blockquote', 'pre'})
+TEXT_TYPES = ('text/html', 'text/plain', 'application/xhtml+xml')
+TRACKING_PARAMS = re.compile(r'^(utm_|gclid$|fbclid$|ref$|src$)')
+
+class HTMLTextExtractor(HTMLParser):
+    """Streaming HTML -> text: feed() chunks as they arrive, then text()."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+        self.in_ld_json = False
+        self.ld_json = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'script' and dict(attrs).get('type') == 'application/ld+json':
+            self.in_ld_json = True
+            self.ld_json.append("")
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+            if tag == 'li':
+                self.parts.append("- ")
+
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self.in_ld_json = False
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self.in_ld_json:
+            self.ld_json[-1] += data
+        elif not self.skip_depth:
+            self.parts.append(data)
+
+    def job_posting(self):
+        """Description from a schema.org JobPosting, if the page embeds one."""
+        for raw in self.ld_json:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                continue
+            items = data if isinstance(data, list) else data.get('@graph', [data]) if isinstance(data, dict) else []
+            for item in items:
+                if isinstance(item, dict) and item.get('@type') == 'JobPosting' and item.get('description'):
+                    inner = HTMLTextExtractor()
+                    inner.feed(item['description'])
+                    inner.close()
+                    title = item.get('title')
+                    return (f"{title}\n" if title else "") + inner.text()
+        return None
+
+    def text(self):
+        lines = (re.sub(r'[ \t\r\f\v\xa0]+', ' ', line).strip() for line in "".join(self.parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+def normalize_url(url):
+    """Cache key for a JD URL; not for fetching (some boards need the query exactly as given)."""
+    parts = urlsplit((url or "").strip())
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not TRACKING_PARAMS.match(k.lower())))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+class JDCache:
+    """sqlite-backed cache of extracted JD text by URL."""
+    EVICT_EVERY = 50
+
+    def __init__(self, path, max_entries=2000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS jd_cache ("
+            " url TEXT PRIMARY KEY, text TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " fetched_at REAL NOT NULL, checked_at REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, url):
+        row = self._conn().execute(
+            "SELECT text, etag, last_modified, checked_at FROM jd_cache WHERE url = ?", (url,)).fetchone()
+        return dict(zip(('text', 'etag', 'last_modified', 'checked_at'), row)) if row else None
+
+    def touch(self, url):
+        self._conn().execute("UPDATE jd_cache SET checked_at = ? WHERE url = ?", (time.time(), url))
+
+    def put(self, url, text, etag, last_modified):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO jd_cache (url, text, etag, last_modified, fetched_at, checked_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)", (url, text, etag, last_modified, now, now))
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            conn.execute(
+                "DELETE FROM jd_cache WHERE url IN ("
+                " SELECT url FROM jd_cache ORDER BY checked_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def _setting(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = _setting('JD_CACHE_PATH', None) or os.path.join(tempfile.gettempdir(), 'aic_jd_cache.sqlite3')
+                try:
+                    _cache = JDCache(path, _setting('JD_CACHE_MAX_ENTRIES', 2000))
+                except sqlite3.Error as e:
+                    logger.warning(f"JD cache unavailable: {e}")
+                    _cache = False
+    return _cache or None
+
+def _download(url, cached):
+    """Returns (text, etag, last_modified), or None when the cached copy is still current (304)."""
+    headers = {'Accept': 'text/html,text/plain;q=0.9'}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('last_modified'):
+        headers['If-Modified-Since'] = cached['last_modified']
+    max_bytes = _setting('JD_FETCH_MAX_BYTES', 2 * 1024 * 1024)
+    timeout = _setting('JD_FETCH_TIMEOUT_SECONDS', 15)
+
+    with get_session().get(url, headers=headers, timeout=(5, timeout), stream=True) as r:
+        if r.status_code == 304 and cached:
+            return None
+        r.raise_for_status()
+        content_type = r.headers.get('Content-Type', 'text/html').split(';')[0].strip().lower()
+        if content_type not in TEXT_TYPES:
+            raise ValueError(f"unsupported content type {content_type}")
+        try:
+            decoder = codecs.getincrementaldecoder(r.encoding or 'utf-8')(errors='replace')
+        except LookupError:  # charset the server made up or Python doesn't know
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        parser = HTMLTextExtractor() if content_type != 'text/plain' else None
+        plain, read = [], 0
+        for chunk in r.iter_content(chunk_size=16384):
+            read += len(chunk)
+            if read > max_bytes:
+                metrics.incr('jd_fetch_truncated')
+                break
+            text = decoder.decode(chunk)
+            if parser:
+                parser.feed(text)
+            else:
+                plain.append(text)
+        if parser:
+            parser.close()
+            text = parser.job_posting() or parser.text()
+        else:
+            text = "".join(plain)
+        return text, r.headers.get('ETag'), r.headers.get('Last-Modified')
+
+def fetch_text(jd_url):
+    """Plain text of the JD at jd_url ('' if it can't be fetched and isn't cached)."""
+    url = (jd_url or "").strip()
+    try:
+        key = normalize_url(url)
+        scheme = urlsplit(key).scheme
+    except ValueError as e:  # e.g. an unbalanced '[' in the host
+        logger.warning(f"Invalid JD URL {jd_url!r}: {e}")
+        return ""
+    if scheme not in ('http', 'https'):
+        return ""
+    cache = get_cache()
+    try:
+        cached = cache.get(key) if cache else None
+    except sqlite3.Error as e:
+        logger.warning(f"JD cache read failed: {e}")
+        cache = cached = None
+    if cached and time.time() - cached['checked_at'] < _setting('JD_CACHE_FRESH_SECONDS', 3600):
+        metrics.incr('jd_cache_hits')
+        return cached['text']
+
+    try:
+        fetched = _download(url, cached)
+    except (requests.RequestException, ValueError, LookupError) as e:
+        metrics.incr('jd_fetch_errors')
+        logger.warning(f"JD fetch failed for {url}: {e}")
+        return cached['text'] if cached else ""
+
+    try:
+        if fetched is None:
+            metrics.incr('jd_cache_revalidated')
+            cache.touch(key)
+            return cached['text']
+        metrics.incr('jd_cache_misses')
+        text, etag, last_modified = fetched
+        if cache and text:
+            cache.put(key, text, etag, last_modified)
+    except sqlite3.Error as e:
+        logger.warning(f"JD cache write failed: {e}")
+    return cached['text'] if fetched is None else fetched[0]
@@ -0,0 +1,184 @@
+"""
+DB-backed job queue for slow, retryable work kept out of the web workers.
+
+Jobs live in the `jobs` table, are deduplicated by idempotency key, and are
+claimed with SELECT ... FOR UPDATE SKIP LOCKED so any number of workers can run:
+
+    flask --app wsgi jobs-worker
+"""
+import time
+import random
+import logging
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from .app import db
+from .models import Job, Interview, InterviewTurn
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+def handler(kind):
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+def enabled():
+    return bool(current_app.config.get('BACKGROUND_JOBS'))
+
+def enqueue(kind, idempotency_key, payload, user_id=None, max_attempts=None):
+    """Adds a job unless one with the same key exists; returns the (new or existing) job."""
+    job = Job.query.filter_by(idempotency_key=idempotency_key).first()
+    if job:
+        return job
+    job = Job(
+        kind=kind,
+        idempotency_key=idempotency_key,
+        user_id=user_id,
+        payload=payload,
+        status='queued',
+        attempts=0,
+        max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 3),
+        run_after=datetime.utcnow(),
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(job)
+    except IntegrityError:
+        # another request enqueued the same key between our check and insert
+        job = Job.query.filter_by(idempotency_key=idempotency_key).first()
+    return job
+
+def requeue(job):
+    """Gives a failed job a fresh set of attempts (a user asked for its result again)."""
+    if job.status != 'failed':
+        return job
+    logger.info(f"Re-queueing failed job {job.id} ({job.kind}): {job.last_error}")
+    job.status = 'queued'
+    job.attempts = 0
+    job.run_after = datetime.utcnow()
+    job.locked_at = None
+    job.last_error = None
+    return job
+
+def enqueue_session_report(interview):
+    """Precompute everything the post-interview screens need once an interview completes."""
+    payload = {'interview_id': str(interview.id)}
+    jobs = [enqueue('final_feedback', f"final_feedback:{interview.id}", payload, user_id=interview.user_id)]
+    if interview.credit_type_used == 'paid':
+        jobs.append(enqueue('post_session_suggestions', f"post_session_suggestions:{interview.id}",
+                            payload, user_id=interview.user_id))
+    return jobs
+
+def claim_next():
+    """Atomically moves the next runnable job to 'running' and returns it (or None)."""
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=current_app.config.get('JOB_LOCK_TIMEOUT_SECONDS', 600))
+    job = (Job.query
+           .filter(db.or_(
+               db.and_(Job.status == 'queued', Job.run_after <= now),
+               # a worker died mid-job; pick it up again
+               db.and_(Job.status == 'running', Job.locked_at < stale_before),
+           ))
+           .order_by(Job.run_after.asc(), Job.id.asc())
+           .with_for_update(skip_locked=True)
+           .first())
+    if not job:
+        db.session.rollback()
+        return None
+    job.status = 'running'
+    job.attempts += 1
+    job.locked_at = now
+    db.session.commit()
+    return job
+
+def run_job(job):
+    fn = HANDLERS.get(job.kind)
+    try:
+        if not fn:
+            raise RuntimeError(f"No handler registered for job kind '{job.kind}'")
+        result = fn(job.payload or {})
+        job.result = result
+        job.status = 'succeeded'
+        job.last_error = None
+    except Exception as e:
+        db.session.rollback()
+        logger.exception(f"Job {job.id} ({job.kind}) failed on attempt {job.attempts}")
+        job.last_error = str(e)[:2000]
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+        else:
+            base = current_app.config.get('JOB_RETRY_BASE_SECONDS', 10)
+            delay = base * (2 ** (job.attempts - 1)) * (1 + random.random() * 0.25)
+            job.status = 'queued'
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+    job.locked_at = None
+    db.session.commit()
+
+def work(once=False, poll_interval=None):
+    poll_interval = poll_interval or current_app.config.get('JOB_POLL_SECONDS', 2)
+    while True:
+        job = claim_next()
+        if job:
+            run_job(job)
+            db.session.remove()
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
+
+def register_cli(app):
+    @app.cli.command('jobs-worker')
+    @click.option('--once', is_flag=True, help='Drain runnable jobs and exit.')
+    def jobs_worker(once):
+        """Process background jobs (final feedback, post-session suggestions)."""
+        logger.info("Job worker started")
+        work(once=once)
+
+# ---------- Handlers ----------
+
+def _load_interview(payload):
+    import uuid
+    interview = Interview.query.get(uuid.UUID(payload['interview_id']))
+    if not interview:
+        raise RuntimeError(f"Interview {payload['interview_id']} not found")
+    return interview
+
+def session_transcript(interview):
+    turns = (InterviewTurn.query
+             .filter_by(interview_id=interview.id)
+             .order_by(InterviewTurn.turn_no.asc())
+             .all())
+    return [{
+        'turn_no': t.turn_no,
+        'question': t.question,
+        'answer': t.answer,
+        'topic': t.topic,
+        'wpm': t.wpm,
+        'filler_count': t.filler_count,
+        'score': t.score
+    } for t in turns]
+
+@handler('final_feedback')
+def _final_feedback(payload):
+    from . import services
+    interview = _load_interview(payload)
+    if not interview.detailed_feedback:
+        detailed_feedback, overall_score = services.generate_final_feedback(interview)
+        interview.detailed_feedback = detailed_feedback
+        interview.overall_score = overall_score
+        interview.status = 'completed'
+    return {'overall_score': interview.overall_score}
+
+@handler('post_session_suggestions')
+def _post_session_suggestions(payload):
+    from . import services
+    interview = _load_interview(payload)
+    if not interview.suggestions:
+        interview.suggestions = services.generate_post_session_suggestions(interview, session_transcript(interview))
+    return {'ok': True}
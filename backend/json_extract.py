@@ -0,0 +1,251 @@
+"""
+Tolerant extraction of JSON objects from LLM output.
+
+Gemini wraps JSON in code fences, adds prose around it, sometimes returns two
+objects, and gets cut off at maxOutputTokens. Rather than paying for another
+call on any of those, extract_object():
+1. raw_decodes top-level objects left to right, so fences, prose and several
+   objects are handled without a greedy regex
+2. repairs an object that doesn't parse: trailing commas are dropped and a
+   truncated object is cut back to its last complete top-level member, so a key
+   whose value was cut off is missing (and fails required_keys) rather than
+   holding half a value. Complete objects nested inside a truncated one are
+   never returned in its place.
+
+Scanner does the bracket/string tracking incrementally (each streamed chunk is
+scanned once), so StreamParser can return the best-effort object after every
+chunk, e.g. to show a question's text while Gemini is still writing it. Only
+StreamParser closes an unfinished string and returns it as a (partial) value.
+"""
+import re
+import json
+import logging
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+_CLOSERS = {'{': '}', '[': ']'}
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+class Scanner:
+    """Tracks string/escape state and open brackets of a growing JSON text."""
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.start = None          # index of the first '{'
+        self.stack = []
+        self.in_string = False
+        self.escape_at = None      # index of an unfinished escape sequence inside a string
+        self.unicode_left = 0
+        self.safe = None           # (index, stack) of the last point where every member was complete
+        self.complete_at = None    # end index once the top-level object has closed
+        self.dangling_comma = False
+        self.member_end = None     # end index of the last complete top-level member
+        self.in_value = False      # past the ':' of a top-level member
+
+    def feed(self, chunk):
+        self.text += chunk
+        text, stack = self.text, self.stack
+        i = self.pos
+        while i < len(text) and self.complete_at is None:
+            c = text[i]
+            if self.in_string:
+                if self.unicode_left:
+                    self.unicode_left -= 1
+                    if not self.unicode_left:
+                        self.escape_at = None
+                elif self.escape_at is not None:
+                    if c == 'u':
+                        self.unicode_left = 4
+                    else:
+                        self.escape_at = None
+                elif c == '\\':
+                    self.escape_at = i
+                elif c == '"':
+                    self.in_string = False
+                    if self.in_value and len(stack) == 1:
+                        self.member_end = i + 1
+            elif self.start is None:
+                if c == '{':
+                    self.start = i
+                    stack.append(c)
+                    self.safe = (i + 1, list(stack))
+                    self.member_end = i + 1
+            elif c == '"':
+                self.in_string = True
+                self.dangling_comma = False
+            elif c in '{[':
+                stack.append(c)
+                self.safe = (i + 1, list(stack))
+                self.dangling_comma = False
+            elif c in '}]':
+                if stack:
+                    stack.pop()
+                self.safe = (i + 1, list(stack))
+                self.dangling_comma = False
+                if not stack:
+                    self.complete_at = i + 1
+                elif self.in_value and len(stack) == 1:
+                    self.member_end = i + 1
+            elif c == ',':
+                self.safe = (i, list(stack))
+                self.dangling_comma = True
+                if len(stack) == 1:
+                    # a number or literal is only known to be whole once the comma follows it
+                    self.member_end = i
+                    self.in_value = False
+            elif c == ':' and len(stack) == 1:
+                self.in_value = True
+            elif not c.isspace():
+                self.dangling_comma = False
+            i += 1
+        self.pos = i
+        return self
+
+    def candidates(self, partial=True):
+        """
+        Closed-up versions of the text so far, most complete first. With partial=False
+        only whole top-level members are kept: the member being written is dropped.
+        """
+        if self.start is None:
+            return
+        if self.complete_at is not None:
+            yield self.text[self.start:self.complete_at]
+            return
+        if not partial:
+            if self.member_end is not None:
+                yield self.text[self.start:self.member_end] + '}'
+            return
+        body = self.text[self.start:]
+        if self.in_string:
+            end = self.escape_at if self.escape_at is not None else len(self.text)
+            body = self.text[self.start:end] + '"'
+        elif self.dangling_comma:
+            body = body.rstrip()[:-1]
+        yield body + "".join(_CLOSERS[b] for b in reversed(self.stack))
+        if self.safe:
+            index, stack = self.safe
+            yield self.text[self.start:index] + "".join(_CLOSERS[b] for b in reversed(stack))
+
+def strip_trailing_commas(text):
+    """Removes commas directly before '}' or ']' outside strings."""
+    out, in_string, escape = [], False, False
+    for c in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in '}]':
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ',':
+                out.pop()
+        out.append(c)
+    return "".join(out)
+
+def _loads(text):
+    for attempt in (text, strip_trailing_commas(text)):
+        try:
+            return json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+def _repaired(scanner):
+    for candidate in scanner.candidates(partial=False):
+        obj = _loads(candidate)
+        if isinstance(obj, dict):
+            return obj
+    return None
+
+def iter_objects(text):
+    """
+    Top-level JSON objects in text, left to right, as (obj, repaired). Objects nested
+    in another are never yielded on their own; a truncated object is closed up and
+    ends the scan, since everything after its '{' is inside it.
+    """
+    i = text.find('{')
+    while i != -1:
+        try:
+            obj, end = _decoder.raw_decode(text, i)
+        except json.JSONDecodeError:
+            scanner = Scanner().feed(text[i:])
+            obj = _repaired(scanner)
+            if obj is not None:
+                yield obj, True
+                if scanner.complete_at is None:
+                    return
+                i = text.find('{', i + scanner.complete_at)
+            else:
+                i = text.find('{', i + 1)
+            continue
+        if isinstance(obj, dict):
+            yield obj, False
+        i = text.find('{', end)
+
+def repair(text):
+    """Best-effort object from malformed or truncated text (from its first '{'), or None."""
+    return _repaired(Scanner().feed(text))
+
+def _legacy_extract(text):
+    # what the old greedy-regex extractor would have returned
+    m = re.search(r"\{.*\}", _FENCE_RE.sub("", text.strip()), re.DOTALL)
+    try:
+        return json.loads(m.group(0)) if m else None
+    except json.JSONDecodeError:
+        return None
+
+def extract_object(raw, required_keys=(), saves_retry=False):
+    """
+    The first top-level JSON object in raw that has required_keys (with no required_keys,
+    the first one), repairing a truncated one; None when there is no such object.
+    saves_retry: the caller regenerates on None, so count llm_json_retries_saved when
+    the old extractor would have failed here.
+    """
+    text = raw or ""
+    obj, repaired = next(((o, r) for o, r in iter_objects(text) if all(k in o for k in required_keys)),
+                         (None, False))
+    if obj is None:
+        metrics.incr('llm_json_failed')
+        logger.warning(f"No JSON object with {list(required_keys)} in LLM output: {text[:200]!r}")
+        return None
+    if repaired:
+        metrics.incr('llm_json_repaired')
+    if saves_retry:
+        legacy = _legacy_extract(text)
+        if not isinstance(legacy, dict) or not all(k in legacy for k in required_keys):
+            # a format error that used to cost a full regeneration
+            metrics.incr('llm_json_retries_saved')
+    return obj
+
+class StreamParser:
+    """Feed streamed text; value() is the best-effort object so far (strings may be partial)."""
+
+    def __init__(self):
+        self.scanner = Scanner()
+
+    def feed(self, chunk):
+        self.scanner.feed(chunk)
+        return self.value()
+
+    def value(self):
+        for candidate in self.scanner.candidates():
+            try:
+                obj = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(obj, dict):
+                return obj
+        return {}
+
+    @property
+    def text(self):
+        return self.scanner.text
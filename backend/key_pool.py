@@ -0,0 +1,236 @@
+"""
+Scheduler for the Gemini API key pool.
+
+Each key has a token bucket (GEMINI_KEY_RPM, bursting to GEMINI_KEY_BURST), a
+cooldown set after a 429 (Retry-After / RetryInfo when Gemini sends one,
+exponential otherwise) and EWMA latency / error-rate health. acquire() takes a
+token from the healthiest available key, waiting briefly when every key is
+drained or cooling down; report() feeds the outcome back.
+
+State is shared by every gunicorn worker on the host through a small SQLite file
+(GEMINI_KEY_STATE = sqlite, the default) or kept per process (memory). Keys are
+stored by a hash prefix, never in clear.
+"""
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from flask import current_app, has_app_context
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.2
+MAX_COOLDOWN_SECONDS = 300
+# consecutive non-429 failures before a key is benched for a cooldown
+FAILURE_STRIKES = 3
+
+def key_id(key):
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+def parse_retry_after(response):
+    """Seconds to back off from a 429: Retry-After header, else the RetryInfo detail in the body."""
+    header = response.headers.get('Retry-After')
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    try:
+        for detail in response.json().get('error', {}).get('details', []):
+            delay = detail.get('retryDelay')
+            if delay and str(delay).endswith('s'):
+                return max(0.0, float(str(delay)[:-1]))
+    except (ValueError, AttributeError, TypeError):
+        pass
+    return None
+
+def _new_state(burst, now):
+    return {"tokens": float(burst), "refilled_at": now, "cooldown_until": 0.0,
+            "strikes": 0, "latency": None, "errors": 0.0}
+
+class MemoryStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield self._states
+
+class SQLiteStore:
+    """Key states in one table; BEGIN IMMEDIATE serialises read-modify-write across processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS gemini_keys (key_id TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            states = {k: json.loads(v) for k, v in conn.execute("SELECT key_id, state FROM gemini_keys")}
+            before = {k: dict(v) for k, v in states.items()}
+            yield states
+            for k, v in states.items():
+                if before.get(k) != v:
+                    conn.execute("INSERT OR REPLACE INTO gemini_keys (key_id, state) VALUES (?, ?)",
+                                 (k, json.dumps(v)))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+class KeyPool:
+    def __init__(self, keys, store, rpm=60, burst=10, cooldown=5.0):
+        self.keys = list(keys)
+        self.ids = [key_id(k) for k in self.keys]
+        self.store = store
+        self.rate = rpm / 60.0
+        self.burst = burst
+        self.cooldown = cooldown
+
+    def _refill(self, state, now):
+        # refilled_at sits in the future while a key cools down; nothing accrues until then
+        if now > state["refilled_at"]:
+            state["tokens"] = min(self.burst, state["tokens"] + (now - state["refilled_at"]) * self.rate)
+            state["refilled_at"] = now
+
+    def _cost(self, state):
+        # unknown latency ranks like a 1s key so new keys get tried
+        latency = state["latency"] if state["latency"] is not None else 1.0
+        return latency * (1.0 + 4.0 * state["errors"]) + random.random() * 1e-3
+
+    def _try_acquire(self, allowed, exclude, now):
+        """Returns (index, None) on success, else (None, seconds until a key frees up)."""
+        with self.store.transaction() as states:
+            best, best_cost, soonest = None, None, None
+            for i in allowed:
+                if i in exclude:
+                    continue
+                state = states.setdefault(self.ids[i], _new_state(self.burst, now))
+                self._refill(state, now)
+                ready_at = max(now, state["cooldown_until"], state["refilled_at"])
+                if state["tokens"] < 1:
+                    ready_at += (1.0 - state["tokens"]) / self.rate
+                if ready_at > now:
+                    soonest = ready_at - now if soonest is None else min(soonest, ready_at - now)
+                    continue
+                cost = self._cost(state)
+                if best is None or cost < best_cost:
+                    best, best_cost = i, cost
+            if best is not None:
+                states[self.ids[best]]["tokens"] -= 1.0
+            return best, soonest
+
+    def acquire(self, allowed, exclude=(), wait=0.0):
+        """Index of the key to use next, or None if none frees up within `wait` seconds."""
+        deadline = time.monotonic() + wait
+        waited = False
+        while True:
+            index, soonest = self._try_acquire(allowed, exclude, time.time())
+            if index is not None:
+                return index
+            remaining = deadline - time.monotonic()
+            if soonest is None or soonest > remaining:
+                metrics.incr('gemini_keys_exhausted')
+                return None
+            if not waited:
+                metrics.incr('gemini_key_waits')
+                waited = True
+            time.sleep(soonest + 0.01)
+
+    def report(self, index, ok, latency=None, throttled=False, retry_after=None):
+        now = time.time()
+        with self.store.transaction() as states:
+            state = states.setdefault(self.ids[index], _new_state(self.burst, now))
+            state["errors"] = (1 - EWMA_ALPHA) * state["errors"] + EWMA_ALPHA * (0.0 if ok else 1.0)
+            if latency is not None:
+                state["latency"] = latency if state["latency"] is None else \
+                    (1 - EWMA_ALPHA) * state["latency"] + EWMA_ALPHA * latency
+            if ok:
+                state["strikes"] = 0
+                return
+            state["strikes"] += 1
+            if throttled:
+                metrics.incr('gemini_key_throttled')
+                # the bucket was too optimistic for this key; start it empty after the cooldown
+                state["tokens"] = 0.0
+                backoff = retry_after if retry_after is not None else \
+                    self.cooldown * 2 ** min(state["strikes"] - 1, 6)
+            elif state["strikes"] >= FAILURE_STRIKES:
+                backoff = self.cooldown
+            else:
+                return
+            state["cooldown_until"] = max(state["cooldown_until"], now + min(backoff, MAX_COOLDOWN_SECONDS))
+            state["refilled_at"] = max(state["refilled_at"], state["cooldown_until"])
+
+    def snapshot(self):
+        now = time.time()
+        with self.store.transaction() as states:
+            return [{
+                "key": i,
+                "tokens": round(min(self.burst, s["tokens"] + max(0.0, now - s["refilled_at"]) * self.rate), 2),
+                "cooldown_seconds": round(max(0.0, s["cooldown_until"] - now), 2),
+                "latency_ms": round(s["latency"] * 1000) if s["latency"] is not None else None,
+                "error_rate": round(s["errors"], 3),
+            } for i, s in ((i, states.get(self.ids[i])) for i in range(len(self.keys))) if s]
+
+_lock = threading.Lock()
+_pool = None
+_pool_sig = None
+
+def _build_store(cfg):
+    if (cfg.get('GEMINI_KEY_STATE') or 'sqlite').lower() == 'sqlite':
+        path = cfg.get('GEMINI_KEY_STATE_PATH') or os.path.join(tempfile.gettempdir(), 'aic_gemini_keys.sqlite3')
+        try:
+            return SQLiteStore(path)
+        except sqlite3.Error as e:
+            logger.warning(f"Gemini key state file unavailable ({e}); using per-process state")
+    return MemoryStore()
+
+def get_pool(keys):
+    """Per-process KeyPool for the configured keys (rebuilt if the key list or pid changes)."""
+    global _pool, _pool_sig
+    cfg = current_app.config if has_app_context() else {}
+    sig = (tuple(keys), os.getpid())
+    if _pool is None or _pool_sig != sig:
+        with _lock:
+            if _pool is None or _pool_sig != sig:
+                _pool = KeyPool(keys, _build_store(cfg),
+                                rpm=cfg.get('GEMINI_KEY_RPM', 60),
+                                burst=cfg.get('GEMINI_KEY_BURST', 10),
+                                cooldown=cfg.get('GEMINI_KEY_COOLDOWN_SECONDS', 5.0))
+                _pool_sig = sig
+    return _pool
+
+def reset():
+    global _pool, _pool_sig
+    with _lock:
+        _pool = None
+        _pool_sig = None
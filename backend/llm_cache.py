@@ -0,0 +1,165 @@
+"""
+Response cache for repeatable LLM prompts (JD rubrics, resume story banks,
+first-turn greetings).
+
+Keys are a SHA-256 over the whitespace-normalised prompt, the model and the
+generation params, so cosmetic prompt differences still hit. Two backends:
+- memory: per-process LRU with TTL
+- sqlite: a file shared by every gunicorn worker on the host
+Selected with LLM_CACHE_BACKEND = none | memory | sqlite.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from flask import current_app, has_app_context
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", (prompt or "").strip())
+
+def make_key(prompt: str, model: str, **params) -> str:
+    material = json.dumps({"prompt": normalize_prompt(prompt), "model": model, "params": params},
+                          sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class MemoryBackend:
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            # stored serialised so callers can't mutate the cached object
+            return json.loads(value)
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, json.dumps(value, ensure_ascii=False))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class SQLiteBackend:
+    # evict at most once per this many writes; keeps set() cheap
+    EVICT_EVERY = 50
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now + ttl, now)
+        )
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM llm_cache")
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def _build_backend(cfg):
+    kind = (cfg.get('LLM_CACHE_BACKEND') or 'none').lower()
+    if kind == 'memory':
+        return MemoryBackend(cfg.get('LLM_CACHE_MAX_ENTRIES', 1000))
+    if kind == 'sqlite':
+        path = cfg.get('LLM_CACHE_PATH') or os.path.join(tempfile.gettempdir(), 'aic_llm_cache.sqlite3')
+        return SQLiteBackend(path, cfg.get('LLM_CACHE_MAX_ENTRIES', 1000))
+    return None
+
+def get_backend():
+    global _backend
+    if _backend is None and has_app_context():
+        with _backend_lock:
+            if _backend is None:
+                _backend = _build_backend(current_app.config) or False
+    return _backend or None
+
+def lookup(key):
+    backend = get_backend()
+    if not backend:
+        return None
+    try:
+        value = backend.get(key)
+    except Exception as e:
+        logger.warning(f"LLM cache read failed: {e}")
+        metrics.incr('llm_cache_errors')
+        return None
+    metrics.incr('llm_cache_hits' if value is not None else 'llm_cache_misses')
+    return value
+
+def store(key, value, ttl=None):
+    backend = get_backend()
+    if not backend:
+        return
+    if ttl is None:
+        ttl = current_app.config.get('LLM_CACHE_TTL_SECONDS', 86400)
+    try:
+        backend.set(key, value, ttl)
+    except Exception as e:
+        logger.warning(f"LLM cache write failed: {e}")
+        metrics.incr('llm_cache_errors')
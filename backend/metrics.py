@@ -0,0 +1,306 @@
+"""
+In-process metrics: counters, fixed-bucket histograms and gauges, optionally labelled.
+
+An update is one dict operation under a lock. After configure(directory), each
+process also writes its state to <directory>/<pid>-<start>.json (on the first
+update after flush_seconds, and whenever metrics are collected), and collect()
+adds up every worker's file, so /api/metrics covers the whole host whichever
+gunicorn worker answers. Counters and histograms of workers that have exited are
+folded into archive.json so totals never go backwards; their gauges are dropped.
+Point the directory at a per-deploy location (it is not cleaned up on restart).
+"""
+import os
+import re
+import json
+import time
+import bisect
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; exited workers' files are then just left in place
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# counters named <prefix>_hits / <prefix>_misses get a derived <prefix>_hit_ratio gauge
+HIT_RATIO_PREFIXES = ('llm_cache', 'jd_cache', 'prefetch')
+ARCHIVE = 'archive.json'
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()  # one flush at a time per process; others skip theirs
+_counters = {}    # (name, labels) -> number
+_histograms = {}  # (name, labels) -> {"buckets": (bounds...), "counts": [...], "sum": float, "count": int}
+_gauges = {}      # (name, labels) -> zero-argument callable, read at collection time
+_directory = None
+_flush_seconds = 0
+_next_flush = float('inf')
+_started = time.time()
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+def incr(name: str, amount: int = 1, labels=None):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+    if time.monotonic() >= _next_flush:
+        flush()
+
+def observe(name: str, value: float, buckets, labels=None):
+    """Adds value to a fixed-bucket histogram (bucket bounds are upper bounds, in ascending order)."""
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = {"buckets": tuple(buckets), "counts": [0] * (len(buckets) + 1),
+                                    "sum": 0.0, "count": 0}
+        h["counts"][bisect.bisect_left(h["buckets"], value)] += 1
+        h["sum"] += value
+        h["count"] += 1
+    if time.monotonic() >= _next_flush:
+        flush()
+
+@contextmanager
+def timed(name: str, buckets=LATENCY_BUCKETS, labels=None):
+    """Observes the block's wall time in seconds (labels may be filled in inside the block)."""
+    labels = {} if labels is None else labels
+    started = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        observe(name, time.perf_counter() - started, buckets, labels)
+
+def gauge(name: str, fn, labels=None):
+    """Registers a current-value reading (e.g. connections in use); replaces any earlier one."""
+    with _lock:
+        _gauges[_key(name, labels)] = fn
+
+def configure(directory=None, flush_seconds=5):
+    """Shares this process's metrics through `directory` (None: process-local only)."""
+    global _directory, _flush_seconds, _next_flush
+    _directory = directory or None
+    _flush_seconds = flush_seconds
+    _next_flush = time.monotonic() + flush_seconds if _directory and flush_seconds > 0 else float('inf')
+
+def _reset_after_fork():
+    # values recorded in the parent (e.g. a preloading gunicorn master) are the parent's
+    global _lock, _flush_lock, _started, _next_flush
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _counters.clear()
+    _histograms.clear()
+    _started = time.time()
+    if _directory and _flush_seconds > 0:
+        _next_flush = time.monotonic() + _flush_seconds
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _local_state(with_gauges=True):
+    with _lock:
+        state = {
+            "counters": [[n, dict(l), v] for (n, l), v in _counters.items()],
+            "histograms": [[n, dict(l), list(h["buckets"]), list(h["counts"]), h["sum"], h["count"]]
+                           for (n, l), h in _histograms.items()],
+        }
+        gauges = list(_gauges.items()) if with_gauges else []
+    state["gauges"] = []
+    for (name, labels), fn in gauges:
+        try:
+            state["gauges"].append([name, dict(labels), fn()])
+        except Exception as e:
+            logger.warning(f"Gauge {name} failed: {e}")
+    return state
+
+def _write_json(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def flush():
+    """
+    Writes this process's state to the shared directory (no-op unless configured).
+    Skipped if another thread is already flushing; that write is at most moments old.
+    """
+    global _next_flush
+    if not _directory:
+        return
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        if _flush_seconds > 0:
+            _next_flush = time.monotonic() + _flush_seconds
+        os.makedirs(_directory, exist_ok=True)
+        _write_json(os.path.join(_directory, f"{os.getpid()}-{int(_started)}.json"), _local_state())
+    except OSError as e:
+        logger.warning(f"Metrics flush to {_directory} failed: {e}")
+    finally:
+        _flush_lock.release()
+
+def _merge(into, state, with_gauges=True):
+    for name, labels, value in state.get("counters", ()):
+        key = _key(name, labels)
+        into["counters"][key] = into["counters"].get(key, 0) + value
+    for name, labels, buckets, counts, total, count in state.get("histograms", ()):
+        key = _key(name, labels)
+        h = into["histograms"].get(key)
+        if h is None:
+            into["histograms"][key] = {"buckets": tuple(buckets), "counts": list(counts), "sum": total, "count": count}
+        elif h["buckets"] == tuple(buckets):
+            h["counts"] = [a + b for a, b in zip(h["counts"], counts)]
+            h["sum"] += total
+            h["count"] += count
+    if with_gauges:
+        for name, labels, value in state.get("gauges", ()):
+            key = _key(name, labels)
+            into["gauges"][key] = into["gauges"].get(key, 0) + value
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _archive(paths):
+    """Folds the files of exited workers into archive.json (their gauges are dropped)."""
+    if fcntl is None:
+        return
+    with open(os.path.join(_directory, 'archive.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = {"counters": {}, "histograms": {}, "gauges": {}}
+        _merge(archive, _load(os.path.join(_directory, ARCHIVE)) or {}, with_gauges=False)
+        folded = []
+        for path in paths:
+            state = _load(path) if os.path.exists(path) else None
+            if state is not None:
+                _merge(archive, state, with_gauges=False)
+                folded.append(path)
+        if folded:
+            _write_json(os.path.join(_directory, ARCHIVE), _dump(archive))
+            for path in folded:
+                os.remove(path)
+
+def _dump(merged):
+    return {
+        "counters": [[n, dict(l), v] for (n, l), v in merged["counters"].items()],
+        "histograms": [[n, dict(l), list(h["buckets"]), h["counts"], h["sum"], h["count"]]
+                       for (n, l), h in merged["histograms"].items()],
+        "gauges": [[n, dict(l), v] for (n, l), v in merged["gauges"].items()],
+    }
+
+WORKER_FILE_RE = re.compile(r'^(\d+)-\d+\.json$')
+
+def _worker_files():
+    try:
+        names = os.listdir(_directory)
+    except OSError:
+        return []
+    return [(name, int(m.group(1))) for name in names for m in [WORKER_FILE_RE.match(name)] if m]
+
+def collect():
+    """
+    Every worker's metrics added up (this process's alone when not configured), as
+    {"counters"|"histograms"|"gauges": {(name, labels): value}}.
+    """
+    merged = {"counters": {}, "histograms": {}, "gauges": {}}
+    if not _directory:
+        _merge(merged, _local_state())
+    else:
+        flush()
+        exited = [os.path.join(_directory, name) for name, pid in _worker_files() if not _alive(pid)]
+        if exited:
+            try:
+                _archive(exited)
+            except OSError as e:
+                logger.warning(f"Archiving metrics of exited workers failed: {e}")
+        names = [name for name, _ in _worker_files()] + [ARCHIVE]
+        for name in names:
+            state = _load(os.path.join(_directory, name))
+            if state is not None:
+                _merge(merged, state)
+
+    for prefix in HIT_RATIO_PREFIXES:
+        hits = merged["counters"].get((f"{prefix}_hits", ()), 0)
+        misses = merged["counters"].get((f"{prefix}_misses", ()), 0)
+        if hits + misses:
+            merged["gauges"][(f"{prefix}_hit_ratio", ())] = round(hits / (hits + misses), 4)
+    return merged
+
+def _flat_name(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+def snapshot():
+    """Point-in-time copy of the counters, histograms and gauges (all workers when shared)."""
+    merged = collect()
+    out = {_flat_name(n, l): v for (n, l), v in merged["counters"].items()}
+    for (name, labels), h in merged["histograms"].items():
+        buckets = {f"le_{b:g}": c for b, c in zip(h["buckets"], h["counts"])}
+        buckets["le_inf"] = h["counts"][-1]
+        out[_flat_name(name, labels)] = dict(buckets, sum=round(h["sum"], 3), count=h["count"])
+    out.update({_flat_name(n, l): v for (n, l), v in merged["gauges"].items()})
+    return out
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _series(name, labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return name
+    return name + "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _families(items):
+    families = {}
+    for (name, labels), value in sorted(items):
+        families.setdefault(name, []).append((labels, value))
+    return families.items()
+
+def render_prometheus(prefix="aic_"):
+    """Prometheus text exposition format (version 0.0.4) of collect()."""
+    merged = collect()
+    lines = []
+    for name, series in _families(merged["counters"].items()):
+        metric = f"{prefix}{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(f"{_series(metric, labels)} {value:g}" for labels, value in series)
+    for name, series in _families(merged["histograms"].items()):
+        metric = f"{prefix}{name}"
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, h in series:
+            cumulative = 0
+            for bound, count in zip(list(h["buckets"]) + ["+Inf"], h["counts"]):
+                cumulative += count
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                lines.append(f"{_series(metric + '_bucket', labels, [('le', le)])} {cumulative}")
+            lines.append(f"{_series(metric + '_sum', labels)} {h['sum']:g}")
+            lines.append(f"{_series(metric + '_count', labels)} {h['count']}")
+    for name, series in _families(merged["gauges"].items()):
+        metric = f"{prefix}{name}"
+        lines.append(f"# TYPE {metric} gauge")
+        lines.extend(f"{_series(metric, labels)} {value:g}" for labels, value in series)
+    return "\n".join(lines) + "\n"
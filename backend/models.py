@@ -35,11 +35,13 @@ class Interview(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
     mode = db.Column(db.String(50), nullable=False)  # 'normal' or 'tech'
-    status = db.Column(db.String(50), nullable=False, default='created')
+    status = db.Column(db.String(50), nullable=False, default='created')  # see backend/interview_state.py
+    turn_claimed_at = db.Column(db.DateTime, nullable=True)  # set while a turn is 'generating'
 
     user_data = db.Column(JSONB)
     interviewer_personality = db.Column(JSONB)
     conversation_history = db.Column(JSONB)  # legacy; keep for backward compat
+    context = db.Column(JSONB)  # rolling prompt context, see services.context_add_question
     live_feedback = db.Column(JSONB)
     pronunciation_feedback = db.Column(JSONB)
 
@@ -48,11 +50,19 @@ class Interview(db.Model):
 
     overall_score = db.Column(db.Float, nullable=True)
     detailed_feedback = db.Column(db.Text, nullable=True)
+    suggestions = db.Column(JSONB, nullable=True)  # post-session drills/follow-ups, generated once
+    job_description_id = db.Column(db.Integer, db.ForeignKey('job_descriptions.id'), nullable=True, index=True)
 
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     turns = db.relationship('InterviewTurn', backref='interview', lazy=True, cascade="all, delete-orphan")
+    job_description = db.relationship('JobDescription', lazy=True)
+
+    __table_args__ = (
+        # history listing: WHERE user_id = ? AND status = 'completed' ORDER BY created_at DESC
+        db.Index('ix_interviews_user_status_created', 'user_id', 'status', 'created_at'),
+    )
 
     def __repr__(self):
         return f'<Interview {self.id} for User {self.user_id}>'
@@ -84,3 +94,63 @@ class Payment(db.Model):
     raw_payload = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Job(db.Model):
+    """Background work item, processed by `flask jobs-worker` (see backend/jobs.py)."""
+    __tablename__ = 'jobs'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    kind = db.Column(db.String(50), nullable=False)
+    idempotency_key = db.Column(db.String(128), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+    payload = db.Column(JSONB)
+    result = db.Column(JSONB)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued|running|succeeded|failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    last_error = db.Column(db.Text, nullable=True)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+class BankQuestion(db.Model):
+    """Curated interview question (see backend/question_bank.py). Empty filters match any interview."""
+    __tablename__ = 'question_bank'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    text = db.Column(db.Text, nullable=False, unique=True)
+    topic = db.Column(db.String(100), nullable=True)
+    role = db.Column(db.String(100), nullable=True)
+    experience = db.Column(db.String(50), nullable=True)  # normalize_experience() value
+    domain = db.Column(db.String(10), nullable=True)      # TECH_DOMAIN_LABELS key
+    mode = db.Column(db.String(50), nullable=True)        # 'normal' | 'tech'
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class JobDescription(db.Model):
+    """JD-derived rubric from /prepare, shared by every user who submits the same JD text."""
+    __tablename__ = 'job_descriptions'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    content_hash = db.Column(db.String(64), nullable=False)  # sha256 of the normalised JD text
+    version = db.Column(db.Integer, nullable=False)  # services.RUBRIC_VERSION it was generated with
+    source_url = db.Column(db.Text, nullable=True)
+    role = db.Column(db.String(100), nullable=True)
+    text = db.Column(db.Text, nullable=False)
+    competencies = db.Column(JSONB)
+    rubric = db.Column(JSONB)
+    questions = db.Column(JSONB)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('content_hash', 'version', name='uq_job_descriptions_hash_version'),
+    )
+
+class SingleFlightLease(db.Model):
+    """Cross-worker lease on a single-flight key (see backend/single_flight.py)."""
+    __tablename__ = 'single_flight_leases'
+    key = db.Column(db.String(200), primary_key=True)
+    owner = db.Column(db.String(32), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
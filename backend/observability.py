@@ -0,0 +1,59 @@
+"""
+Request instrumentation feeding backend/metrics.py:
+- http_request_seconds{route,method}: time until the response object is ready
+  (for SSE routes that is the start of the stream, not its end)
+- http_requests{route,method,status}
+- db_queries_per_request{route} and the db_queries total, counted per cursor execute
+
+Routes are labelled by their URL rule (/api/interviews/jobs/<int:job_id>), never the raw
+path, so label cardinality stays bounded.
+"""
+import time
+from flask import Response, g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from . import metrics
+
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_listening = False
+
+def _count_query(*args):
+    metrics.incr('db_queries')
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def _before_request():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+
+def _after_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    route = _route()
+    metrics.observe('http_request_seconds', time.perf_counter() - started, metrics.LATENCY_BUCKETS,
+                    {'route': route, 'method': request.method})
+    metrics.incr('http_requests', labels={'route': route, 'method': request.method,
+                                          'status': response.status_code})
+    metrics.observe('db_queries_per_request', g.get('db_queries', 0), QUERY_BUCKETS, {'route': route})
+    return response
+
+def metrics_response():
+    """/api/metrics: Prometheus text format, or the JSON snapshot for ?format=json / Accept: application/json."""
+    if request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json':
+        return metrics.snapshot()
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+def init_app(app):
+    global _listening
+    metrics.configure(app.config.get('METRICS_DIR'), app.config.get('METRICS_FLUSH_SECONDS', 5))
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+        _listening = True
+    app.before_request(_before_request)
+    app.after_request(_after_request)
@@ -0,0 +1,116 @@
+"""
+Speculative next-question generation.
+
+When a turn is persisted we kick off, in a background thread, the two questions
+the candidate can ask for next: an answer-independent follow-up (used by
+submit-answer) and a rephrased fallback (used by skip-question). The route then
+takes the prepared one instead of waiting on Gemini. Speculation is per process,
+so a request landing on another gunicorn worker simply counts as a miss.
+"""
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('follow_up', 'skip')
+
+_lock = threading.Lock()
+_executor = None
+_pending = {}  # (interview_id, turn_no, kind) -> (future, scheduled_at)
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = current_app.config.get('PREFETCH_WORKERS', 4)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch')
+    return _executor
+
+def _generate(app, interview_id, kind):
+    from .models import Interview
+    from . import services, interview_state
+    with app.app_context():
+        interview = Interview.query.get(interview_id)
+        # 'generating': the candidate already answered and the route may still take this
+        if not interview or interview.status not in ('started', 'generating'):
+            return None
+        # no pooled connection is held while Gemini runs
+        interview_state.detach(interview)
+        if kind == 'skip':
+            return services.get_next_turn(interview, force_rephrase=True)
+        return services.get_next_turn(interview, speculative=True)
+
+def _purge_expired(ttl):
+    now = time.monotonic()
+    for key, (future, scheduled_at) in list(_pending.items()):
+        if now - scheduled_at > ttl:
+            _pending.pop(key, None)
+            future.cancel()
+            metrics.incr('prefetch_expired')
+
+def schedule(interview_id, turn_no):
+    """Start generating the candidates for the turn after `turn_no`. No-op unless enabled."""
+    cfg = current_app.config
+    if not cfg.get('PREFETCH_NEXT_QUESTION'):
+        return
+    app = current_app._get_current_object()
+    executor = _get_executor()
+    with _lock:
+        _purge_expired(cfg.get('PREFETCH_TTL_SECONDS', 900))
+        for kind in KINDS:
+            key = (interview_id, turn_no, kind)
+            if key in _pending:
+                continue
+            _pending[key] = (executor.submit(_generate, app, interview_id, kind), time.monotonic())
+            metrics.incr('prefetch_scheduled')
+
+def take(interview_id, turn_no, kind):
+    """
+    Returns a prepared (question, topic) for the turn after `turn_no`, or None on a miss.
+    The other candidate for the same turn is discarded.
+    """
+    if not current_app.config.get('PREFETCH_NEXT_QUESTION'):
+        return None
+    with _lock:
+        entries = {k: _pending.pop((interview_id, turn_no, k), None) for k in KINDS}
+    for other, entry in entries.items():
+        if other != kind and entry:
+            entry[0].cancel()
+            metrics.incr('prefetch_wasted')
+
+    entry = entries.get(kind)
+    if not entry:
+        metrics.incr('prefetch_misses')
+        return None
+    future = entry[0]
+    # an in-flight call is still closer to done than a fresh one
+    wait = 0 if future.done() else current_app.config.get('PREFETCH_WAIT_SECONDS', 5)
+    try:
+        result = future.result(timeout=wait)
+    except FutureTimeout:
+        future.cancel()
+        metrics.incr('prefetch_misses')
+        return None
+    except Exception as e:
+        logger.warning(f"Prefetch for interview {interview_id} failed: {e}")
+        metrics.incr('prefetch_errors')
+        metrics.incr('prefetch_misses')
+        return None
+    if not result:
+        metrics.incr('prefetch_misses')
+        return None
+    metrics.incr('prefetch_hits')
+    return result
+
+def discard(interview_id):
+    """Drop everything prepared for an interview (completed/cancelled)."""
+    with _lock:
+        for key in [k for k in _pending if k[0] == interview_id]:
+            _pending.pop(key)[0].cancel()
+            metrics.incr('prefetch_wasted')
@@ -0,0 +1,205 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled when it carries `X-Profile: <PROFILE_TOKEN>` or is picked
+by PROFILE_SAMPLE_RATE. For a profiled request we record spans:
+- db:   every SQL statement (SQLAlchemy cursor events)
+- http: every outbound call through http_client's session (Gemini, JD pages),
+        timed to the response headers
+- stt:  transcription, including the wait for a pool process
+and answer with a `Server-Timing` header (db / http / stt / app / total). The
+span list is written to PROFILE_DIR/<id>.json, with a cProfile dump next to it
+(<id>.prof, open with snakeviz or `python -m pstats`) when PROFILE_ENGINE is
+'cprofile', or an HTML call tree (<id>.html) when it is 'pyinstrument' and that
+package is installed. Only one request per process is under cProfile/pyinstrument
+at a time; concurrent profiled requests still get their spans.
+
+With no sample rate and no token nothing is registered, so unprofiled requests
+pay nothing. Streamed (SSE) responses are profiled until the stream starts.
+"""
+import os
+import json
+import time
+import uuid
+import random
+import logging
+import cProfile
+import tempfile
+import threading
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'X-Profile'
+SPAN_KINDS = ('db', 'http', 'stt')
+
+_profiler_lock = threading.Lock()  # one cProfile/pyinstrument session per process at a time
+_listening = False
+
+class RequestProfile:
+
+    def __init__(self):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.started = time.perf_counter()
+        self.spans = []  # (kind, detail, start offset s, duration s)
+        self.profiler = None
+
+    def add(self, kind, detail, started, duration):
+        self.spans.append((kind, detail, round(started - self.started, 6), round(duration, 6)))
+
+    def totals(self):
+        totals = {kind: [0.0, 0] for kind in SPAN_KINDS}
+        for kind, _, _, duration in self.spans:
+            totals.setdefault(kind, [0.0, 0])
+            totals[kind][0] += duration
+            totals[kind][1] += 1
+        return totals
+
+    def server_timing(self, total):
+        totals = self.totals()
+        parts = [f'{kind};dur={secs * 1000:.1f};desc="{count} calls"' for kind, (secs, count) in totals.items()]
+        app_secs = max(0.0, total - sum(secs for secs, _ in totals.values()))
+        parts.append(f"app;dur={app_secs * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+def current():
+    """The RequestProfile of the request being handled, or None (not profiled / no request)."""
+    return g.get('profile') if has_request_context() else None
+
+class span:
+    """`with profiling.span('stt', provider):` records the block on the current request's profile."""
+
+    def __init__(self, kind, detail=None):
+        self.kind, self.detail = kind, detail
+
+    def __enter__(self):
+        self.profile = current()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile is not None:
+            self.profile.add(self.kind, self.detail, self.started, time.perf_counter() - self.started)
+        return False
+
+def record_http(response, *args, **kwargs):
+    """requests response hook (see http_client): time to the response headers."""
+    profile = current()
+    if profile is not None:
+        duration = response.elapsed.total_seconds()
+        detail = f"{response.request.method} {response.url.split('?', 1)[0]} {response.status_code}"
+        profile.add('http', detail, time.perf_counter() - duration, duration)
+    return response
+
+# the start time lives on the statement's execution context, so a statement that
+# fails (no after_cursor_execute) leaves nothing behind on the connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current() is not None:
+        context._profile_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current()
+    began = getattr(context, '_profile_started', None)
+    if profile is not None and began is not None:
+        profile.add('db', " ".join(statement.split())[:200], began, time.perf_counter() - began)
+
+def _start_profiler(engine):
+    if engine not in ('cprofile', 'pyinstrument') or (engine == 'pyinstrument' and pyinstrument is None):
+        return None
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    try:
+        if engine == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+        return profiler
+    except Exception as e:  # e.g. another profiler already active in this interpreter
+        _profiler_lock.release()
+        logger.warning(f"Profiler not started: {e}")
+        return None
+
+def _stop_profiler(profiler, path=None):
+    """Stops the profiler and, given a path, writes its output next to the span file."""
+    try:
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            if path:
+                profiler.dump_stats(path + '.prof')
+        else:
+            profiler.stop()
+            if path:
+                with open(path + '.html', 'w') as f:
+                    f.write(profiler.output_html())
+    finally:
+        _profiler_lock.release()
+
+def _should_profile(app):
+    token = app.config.get('PROFILE_TOKEN')
+    if token and request.headers.get(HEADER) == token:
+        return True
+    rate = app.config.get('PROFILE_SAMPLE_RATE', 0)
+    return rate > 0 and random.random() < rate
+
+def init_app(app):
+    global _listening
+    if not app.config.get('PROFILE_TOKEN') and not app.config.get('PROFILE_SAMPLE_RATE', 0):
+        return
+    directory = app.config.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'aic_profiles')
+    engine = (app.config.get('PROFILE_ENGINE') or 'none').lower()
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+    @app.before_request
+    def _start_profile():
+        if _should_profile(app):
+            g.profile = RequestProfile()
+            g.profile.profiler = _start_profiler(engine)
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        total = time.perf_counter() - profile.started
+        path = os.path.join(directory, profile.id)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if profile.profiler is not None:
+                profiler, profile.profiler = profile.profiler, None
+                _stop_profiler(profiler, path)
+            with open(path + '.json', 'w') as f:
+                json.dump({
+                    'id': profile.id,
+                    'method': request.method,
+                    'route': request.url_rule.rule if request.url_rule is not None else request.path,
+                    'status': response.status_code,
+                    'total_seconds': round(total, 6),
+                    'totals': {kind: {'seconds': round(secs, 6), 'calls': count}
+                               for kind, (secs, count) in profile.totals().items()},
+                    'spans': [dict(zip(('kind', 'detail', 'start', 'seconds'), s)) for s in profile.spans],
+                }, f, indent=1)
+        except OSError as e:
+            logger.warning(f"Writing profile {profile.id} failed: {e}")
+        response.headers['Server-Timing'] = profile.server_timing(total)
+        response.headers['X-Profile-Id'] = profile.id
+        return response
+
+    @app.teardown_request
+    def _abandon_profile(exc):
+        # after_request didn't run (unhandled exception with exceptions propagating)
+        profile = g.pop('profile', None)
+        if profile is not None and profile.profiler is not None:
+            _stop_profiler(profile.profiler)
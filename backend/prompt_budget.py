@@ -0,0 +1,151 @@
+"""
+Token budgets for the large Gemini prompts (final feedback, suggestions, JD
+rubric, resume stories).
+
+Tokens are estimated locally (~4 characters or ~0.75 words per token, whichever
+is larger), which is close enough for budgeting without a tokenizer. Over-budget
+input is shrunk rather than cut off:
+- transcripts: questions stay whole; answer space is shared out evenly, and
+  answers over their share are summarised extractively (highest-scoring
+  sentences, kept in original order)
+- documents (JD, resume): repeated lines and boilerplate (EEO, cookie, apply-now
+  text) are dropped first, then the remaining lines are ranked the same way
+  (long lines are treated sentence by sentence)
+
+Every built prompt's estimated size goes into a `prompt_tokens_<kind>` histogram.
+"""
+import re
+import math
+from collections import Counter
+from flask import current_app, has_app_context
+
+from . import metrics
+
+PROMPT_TOKEN_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+WORD_RE = re.compile(r"[\w']+", re.UNICODE)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+STOPWORDS = frozenset(
+    "a an the and or but if then so of to in on at for with by from as is are was were be been being "
+    "i me my we our you your he she it its they them their this that these those there here what which "
+    "who whom when where why how do did does done have has had not no yes just also very really "
+    "can could would should will shall may might must about into over than too".split()
+)
+BOILERPLATE_RE = re.compile(
+    r"equal opportunity|affirmative action|without regard to (race|religion)|reasonable accommodation|"
+    r"we use cookies|cookie (policy|settings)|privacy (policy|notice)|terms of (use|service)|"
+    r"all rights reserved|apply now|share this job|sign in|log in|create (job )?alert|"
+    r"follow us|subscribe|back to (search|jobs)",
+    re.I,
+)
+
+def _setting(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    return math.ceil(max(len(text) / 4.0, len(WORD_RE.findall(text)) * 4.0 / 3.0))
+
+def observe(kind, prompt):
+    tokens = estimate_tokens(prompt)
+    metrics.observe(f"prompt_tokens_{kind}", tokens, PROMPT_TOKEN_BUCKETS)
+    return tokens
+
+def _terms(text):
+    return [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 2]
+
+def _select(units, budget):
+    """Keeps the highest-scoring units that fit the budget, in their original order."""
+    freq = Counter(t for u in units for t in _terms(u))
+    scored = []
+    for i, unit in enumerate(units):
+        terms = _terms(unit)
+        # the opening unit (a JD's title, an answer's framing sentence) always goes first
+        score = float('inf') if i == 0 else sum(freq[t] for t in set(terms)) / (1.0 + len(terms)) ** 0.5
+        scored.append((score, i))
+    keep, used = set(), 0
+    for score, i in sorted(scored, reverse=True):
+        cost = estimate_tokens(units[i])
+        if used + cost <= budget:
+            keep.add(i)
+            used += cost
+    return [units[i] for i in sorted(keep)]
+
+def summarize(text, budget):
+    """Extractive summary of text within `budget` estimated tokens."""
+    text = (text or "").strip()
+    if estimate_tokens(text) <= budget:
+        return text
+    sentences = [s.strip() for s in SENTENCE_RE.split(text) if s.strip()]
+    kept = _select(sentences, budget)
+    if not kept:
+        # a single run-on sentence: fall back to its head
+        return text[:max(0, budget * 4 - 3)].rstrip() + "..."
+    return " ".join(kept) + (" [...]" if len(kept) < len(sentences) else "")
+
+def _share(sizes, budget):
+    """Water-filling: per-item allowances summing to at most budget; small items keep their size."""
+    allowance = [0] * len(sizes)
+    remaining, pending = budget, sorted(range(len(sizes)), key=lambda i: sizes[i])
+    while pending:
+        fair = remaining // len(pending)
+        i = pending[0]
+        if sizes[i] <= fair:
+            allowance[i] = sizes[i]
+            remaining -= sizes[i]
+            pending.pop(0)
+        else:
+            for j in pending:
+                allowance[j] = fair
+            break
+    return allowance
+
+def fit_transcript(pairs, budget=None, empty_answer="[no answer]"):
+    """
+    pairs: [(question, answer)] in turn order. Returns the "Q: ...\\nA: ..." transcript
+    text, with answers summarised as needed to fit the token budget.
+    """
+    budget = budget or _setting('PROMPT_BUDGET_TRANSCRIPT_TOKENS', 6000)
+    pairs = [((q or "").strip(), (a or "").strip()) for q, a in pairs]
+    fmt = lambda q, a: f"Q: {q}\nA: {a or empty_answer}"
+    if estimate_tokens("\n\n".join(fmt(q, a) for q, a in pairs)) <= budget:
+        return "\n\n".join(fmt(q, a) for q, a in pairs)
+
+    metrics.incr('prompt_transcripts_compacted')
+    fixed = sum(estimate_tokens(fmt(q, "")) + 2 for q, _ in pairs)
+    allowance = _share([estimate_tokens(a) for _, a in pairs], max(0, budget - fixed))
+    return "\n\n".join(fmt(q, summarize(a, allowance[i]) if a else "") for i, (q, a) in enumerate(pairs))
+
+# lines longer than this are handled sentence by sentence (scraped pages are often one long line)
+LONG_LINE_TOKENS = 120
+
+def _units(text):
+    for line in (text or "").splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if estimate_tokens(line) > LONG_LINE_TOKENS:
+            yield from (s.strip() for s in SENTENCE_RE.split(line))
+        else:
+            yield line
+
+def dedupe_document(text):
+    """Drops repeated lines/sentences and page boilerplate (navigation, cookie/EEO notices)."""
+    seen, units = set(), []
+    for unit in _units(text):
+        norm = re.sub(r"[^a-z0-9]+", " ", unit.lower()).strip()
+        if not norm or norm in seen or BOILERPLATE_RE.search(unit):
+            continue
+        seen.add(norm)
+        units.append(unit)
+    return "\n".join(units)
+
+def fit_document(text, budget=None):
+    """Deduplicated document text within the token budget (JD, resume)."""
+    budget = budget or _setting('PROMPT_BUDGET_DOCUMENT_TOKENS', 4000)
+    text = dedupe_document(text)
+    if estimate_tokens(text) <= budget:
+        return text
+    metrics.incr('prompt_documents_compacted')
+    return "\n".join(_select(text.split("\n"), budget))
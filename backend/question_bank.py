@@ -0,0 +1,186 @@
+"""
+Curated question bank, served in place of Gemini for generic turns.
+
+Questions live in the `question_bank` table (seed with `flask seed-question-bank`)
+and are indexed in memory by (role, experience, domain, mode); an empty field on
+a bank row is a wildcard. The index is rebuilt from the table every
+QUESTION_BANK_RELOAD_SECONDS, so edits reach every worker without a restart.
+
+QUESTION_BANK_RATIO is the share of conversation turns drawn from the bank
+(0 = off, 1 = every turn that has an unused match). Bank turns are spread evenly
+through the session; the rest stay personalised follow-ups from the LLM. When the
+bank is on, the welcome greeting is built from the interviewer's openers too.
+"""
+import json
+import os
+import random
+import logging
+import threading
+import time
+import click
+from flask import current_app, has_app_context
+from . import metrics, question_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = os.path.join(os.path.dirname(__file__), 'data', 'question_bank.json')
+FIELDS = ('role', 'experience', 'domain', 'mode')
+
+def _setting(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+def normalize_role(role):
+    return " ".join((role or "").lower().split()) or None
+
+def normalize_domain(domain):
+    """Accepts a TECH_DOMAIN_LABELS key ('DSA') or its label."""
+    from .services import TECH_DOMAIN_LABELS
+    if not domain:
+        return None
+    d = str(domain).strip()
+    for key, label in TECH_DOMAIN_LABELS.items():
+        if d.upper() == key or d.lower() == label.lower():
+            return key
+    return None
+
+class QuestionBank:
+    def __init__(self, rows=()):
+        self.index = {}  # (role, experience, domain, mode) with None wildcards -> [(text, topic)]
+        self.size = 0
+        for r in rows:
+            key = (normalize_role(r['role']), r['experience'] or None,
+                   normalize_domain(r['domain']), r['mode'] or None)
+            self.index.setdefault(key, []).append((r['text'], r['topic'] or 'general'))
+            self.size += 1
+
+    def candidates(self, role, experience, domain, mode):
+        """Matching questions, most specific first (exact fields before wildcards)."""
+        wanted = (normalize_role(role), experience, normalize_domain(domain), mode)
+        out = []
+        for mask in sorted(range(16), key=lambda m: -bin(m).count('1')):
+            key = tuple(v if mask & (1 << i) else None for i, v in enumerate(wanted))
+            if any(v is None for i, v in enumerate(wanted) if mask & (1 << i)):
+                continue  # nothing to match on for that field; covered by the wildcard mask
+            out.append(self.index.get(key, ()))
+        return out
+
+_lock = threading.Lock()
+_bank = None
+_loaded_at = 0.0
+
+def _load():
+    from .app import db
+    from .models import BankQuestion
+    try:
+        # own short-lived connection: turn routes call this with their session closed
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                db.select(BankQuestion.text, BankQuestion.topic, BankQuestion.role,
+                          BankQuestion.experience, BankQuestion.domain, BankQuestion.mode)
+                .where(BankQuestion.active.is_(True))
+            ).all()
+    except Exception as e:
+        logger.warning(f"Question bank unavailable: {e}")
+        rows = []
+    return QuestionBank([r._asdict() for r in rows])
+
+def get_bank():
+    global _bank, _loaded_at
+    ttl = _setting('QUESTION_BANK_RELOAD_SECONDS', 300)
+    if _bank is None or time.monotonic() - _loaded_at > ttl:
+        with _lock:
+            if _bank is None or time.monotonic() - _loaded_at > ttl:
+                _bank = _load()
+                _loaded_at = time.monotonic()
+    return _bank
+
+def reset():
+    global _bank
+    with _lock:
+        _bank = None
+
+def enabled():
+    return _setting('QUESTION_BANK_RATIO', 0.0) > 0
+
+def _bank_turn(turn_no, ratio):
+    # Bresenham-style spread: with ratio 0.5 every second turn, 0.25 every fourth, ...
+    return int(turn_no * ratio) > int((turn_no - 1) * ratio)
+
+def greeting(interview):
+    from .services import INTERVIEWER_PERSONALITIES
+    personality_key = (interview.interviewer_personality or {}).get('key') or 'sarah'
+    p = INTERVIEWER_PERSONALITIES.get(personality_key, INTERVIEWER_PERSONALITIES['sarah'])
+    user_name = (interview.user_data or {}).get('name', 'Candidate')
+    user_role = (interview.user_data or {}).get('role', 'Software Engineer')
+    return (f"{random.choice(p['openers'])} I'm {p['name']}, and I'll be your interviewer for the "
+            f"{user_role} role today, {user_name}. To start, could you briefly introduce yourself?")
+
+def next_question(interview):
+    """
+    Returns (question, topic) from the bank for the interview's next turn, or None
+    when this turn should go to the LLM (bank off, not a bank turn, or no unused match).
+    """
+    from .services import ensure_context, normalize_experience
+    ratio = _setting('QUESTION_BANK_RATIO', 0.0)
+    if ratio <= 0:
+        return None
+    ctx = ensure_context(interview)
+    if ctx["turns"] == 0:
+        metrics.incr('question_bank_served')
+        return greeting(interview), 'introduction'
+    if not _bank_turn(ctx["turns"], min(ratio, 1.0)):
+        metrics.incr('question_bank_llm')
+        return None
+
+    user_data = interview.user_data or {}
+    bank = get_bank()
+    asked = {r["q"] for r in ctx["recent"]}
+    covered = set(ctx["topics"])
+    # one refresh of the user's index for the whole scan, not one per candidate
+    index = question_index.get_index(interview.user_id)
+    with index.lock:
+        for group in bank.candidates(user_data.get('role'), normalize_experience(user_data.get('experience')),
+                                     user_data.get('domain'), interview.mode):
+            # within a specificity level prefer topics not covered yet, random otherwise
+            pool = sorted(group, key=lambda qt: (qt[1] in covered, random.random()))
+            for question, topic in pool:
+                if question in asked or index.find_duplicate(question) is not None:
+                    continue
+                metrics.incr('question_bank_served')
+                return question, topic
+    metrics.incr('question_bank_exhausted')
+    return None
+
+def seed(path=None):
+    """Upserts questions from a JSON seed file (keyed by text); returns (added, updated)."""
+    from .app import db
+    from .models import BankQuestion
+    with open(path or DEFAULT_SEED_PATH, encoding='utf-8') as f:
+        entries = json.load(f)['questions']
+    existing = {q.text: q for q in BankQuestion.query.all()}
+    added = updated = 0
+    for e in entries:
+        q = existing.get(e['text'])
+        if q is None:
+            q = BankQuestion(text=e['text'])
+            db.session.add(q)
+            added += 1
+        else:
+            updated += 1
+        q.topic = e.get('topic')
+        q.active = e.get('active', True)
+        for field in FIELDS:
+            setattr(q, field, e.get(field))
+    db.session.commit()
+    reset()
+    return added, updated
+
+def register_cli(app):
+    @app.cli.command('seed-question-bank')
+    @click.option('--path', default=None, help='JSON seed file (defaults to backend/data/question_bank.json).')
+    def seed_question_bank(path):
+        """Load curated interview questions into the question bank."""
+        added, updated = seed(path)
+        click.echo(f"Question bank: {added} added, {updated} updated")
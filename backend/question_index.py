@@ -0,0 +1,127 @@
+"""
+Near-duplicate guard for generated questions.
+
+Every question asked to a user (across all their interviews) is indexed by a
+MinHash signature over character 5-gram shingles, bucketed with LSH banding.
+A lookup hashes the new question once, gathers the few candidates sharing a
+band, and confirms with exact shingle Jaccard, instead of running
+SequenceMatcher against every prior question.
+
+Indexes are per process and per user (LRU-bounded). Each lookup first pulls in
+turns added since the index was last refreshed, so questions asked through
+other workers are seen too.
+"""
+import re
+import zlib
+import random
+import threading
+from collections import OrderedDict
+from flask import current_app, has_app_context
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SHINGLE = 5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+
+# a, b < 2**29 and crc32 hashes < 2**32 keep a*x+b below 2**62, so it fits uint64 for NumPy
+_rng = random.Random(1337)
+_PERMS = [(_rng.randrange(1, 1 << 29), _rng.randrange(0, 1 << 29)) for _ in range(NUM_PERM)]
+if np is not None:
+    _A = np.array([a for a, _ in _PERMS], dtype=np.uint64)
+    _B = np.array([b for _, b in _PERMS], dtype=np.uint64)
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).strip()
+
+def shingles(text):
+    t = normalize(text)
+    if len(t) <= SHINGLE:
+        return {t} if t else set()
+    return {t[i:i + SHINGLE] for i in range(len(t) - SHINGLE + 1)}
+
+def signature(shingle_set):
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingle_set] or [0]
+    if np is not None:
+        x = np.array(hashes, dtype=np.uint64)
+        return tuple(((_A[:, None] * x[None, :] + _B[:, None]) % np.uint64(_PRIME)).min(axis=1).tolist())
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS)
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / float(len(a | b))
+
+class QuestionIndex:
+    def __init__(self, threshold=0.6):
+        self.threshold = threshold
+        self.shingles = []  # question id -> shingle set
+        self.buckets = {}   # (band, band values) -> [question ids]
+        self.last_turn_id = 0
+        self.lock = threading.Lock()
+
+    def add(self, question):
+        sh = shingles(question)
+        if not sh:
+            return
+        qid = len(self.shingles)
+        self.shingles.append(sh)
+        sig = signature(sh)
+        for band in range(BANDS):
+            self.buckets.setdefault((band, sig[band * ROWS:(band + 1) * ROWS]), []).append(qid)
+
+    def find_duplicate(self, question):
+        """Returns the similarity of the closest prior question at or above threshold, else None."""
+        sh = shingles(question)
+        if not sh:
+            return None
+        sig = signature(sh)
+        candidates = set()
+        for band in range(BANDS):
+            candidates.update(self.buckets.get((band, sig[band * ROWS:(band + 1) * ROWS]), ()))
+        best = max((jaccard(sh, self.shingles[qid]) for qid in candidates), default=0.0)
+        return best if best >= self.threshold else None
+
+_lock = threading.Lock()
+_indexes = OrderedDict()  # user_id -> QuestionIndex
+
+def _refresh(index, user_id):
+    from .app import db
+    from .models import Interview, InterviewTurn
+    # runs between Gemini attempts: use a connection for just this read rather than
+    # opening a session transaction that would stay checked out across the next call
+    with db.engine.connect() as conn:
+        rows = conn.execute(
+            db.select(InterviewTurn.id, InterviewTurn.question)
+            .join(Interview, Interview.id == InterviewTurn.interview_id)
+            .where(Interview.user_id == user_id, InterviewTurn.id > index.last_turn_id)
+            .order_by(InterviewTurn.id.asc())
+        ).all()
+    for turn_id, question in rows:
+        index.add(question)
+        index.last_turn_id = turn_id
+
+def get_index(user_id):
+    cfg = current_app.config if has_app_context() else {}
+    with _lock:
+        index = _indexes.get(user_id)
+        if index is None:
+            index = QuestionIndex(cfg.get('DUPLICATE_QUESTION_THRESHOLD', 0.6))
+            _indexes[user_id] = index
+            while len(_indexes) > cfg.get('QUESTION_INDEX_MAX_USERS', 500):
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(user_id)
+    with index.lock:
+        _refresh(index, user_id)
+    return index
+
+def is_duplicate(user_id, question):
+    index = get_index(user_id)
+    with index.lock:
+        return index.find_duplicate(question) is not None
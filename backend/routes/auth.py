@@ -1,16 +1,54 @@
 # backend/routes/auth.py
 import jwt
+import time
 import secrets
 import hashlib
+import threading
 from datetime import datetime, timedelta
 from functools import wraps
-from flask import request, jsonify, Blueprint, current_app
+from flask import request, jsonify, Blueprint, current_app, g
+from sqlalchemy.orm import make_transient_to_detached
 from ..app import db, bcrypt
 from ..models import User
 from ..utils import send_verification_email, send_password_reset_email
 
 auth_bp = Blueprint('auth', __name__)
 
+# Optional per-process cache of the authenticated principal: user_id -> (expires_at, column values).
+# Off unless USER_CACHE_TTL_SECONDS > 0. Credit changes go through backend/credits.py, which updates
+# balances in SQL and never relies on these cached values.
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+def _load_user(user_id):
+    """At most one user read per request: request identity map, then process cache, then DB."""
+    user = g.get('current_user')
+    if user is not None and user.id == user_id:
+        return user
+
+    ttl = current_app.config.get('USER_CACHE_TTL_SECONDS', 0)
+    user = None
+    if ttl > 0:
+        with _user_cache_lock:
+            entry = _user_cache.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            cached = User(**entry[1])
+            make_transient_to_detached(cached)
+            user = db.session.merge(cached, load=False)
+    if user is None:
+        user = User.query.get(user_id)
+        if user and ttl > 0:
+            values = {c.key: getattr(user, c.key) for c in User.__table__.columns}
+            with _user_cache_lock:
+                _user_cache[user_id] = (time.monotonic() + ttl, values)
+    g.current_user = user
+    return user
+
+def invalidate_user(user_id):
+    """Call after committing profile or credit changes."""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
 def token_required(f):
     from functools import wraps as _wraps
     @_wraps(f)
@@ -24,7 +62,7 @@ def token_required(f):
             return jsonify({'error': 'Token is missing'}), 401
         try:
             data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.get(data['user_id'])
+            current_user = _load_user(data['user_id'])
             if not current_user:
                 return jsonify({'error': 'User not found'}), 404
         except jwt.ExpiredSignatureError:
@@ -1,10 +1,16 @@
 # backend/routes/interviews.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from ..app import db
-from ..models import User, Interview, InterviewTurn
-from .auth import token_required
-from .. import services
+from ..models import User, Interview, InterviewTurn, Job, JobDescription
+from .auth import token_required, invalidate_user
+from .. import credits, interview_state, services, prefetch, jobs, audio_upload, question_bank, single_flight
+from ..stt_pool import TranscriptionBusy
 import uuid
+import hashlib
+import json
+import base64
+from contextlib import contextmanager
+from datetime import datetime
 
 interviews_bp = Blueprint('interviews', __name__)
 
@@ -35,6 +41,7 @@ def prepare_interview(current_user):
     JD-aware preparation: Accepts jd_text or jd_url and returns:
     - extracted competencies & rubric
     - first 3 tailored questions
+    - job_description_id, to pass to /start-interview (null if the rubric is a fallback)
     """
     data = request.get_json() or {}
     jd_text = data.get('jd_text')
@@ -44,14 +51,21 @@ def prepare_interview(current_user):
     if not jd_text and not jd_url:
         return jsonify({'error': 'Provide jd_text or jd_url'}), 400
 
+    # identical concurrent requests (double submit, client retry) share one Gemini call
+    flight_key = "prepare:" + hashlib.sha256(
+        json.dumps([role, jd_text, jd_url], ensure_ascii=False).encode('utf-8')).hexdigest()
     try:
-        rubric, first_questions = services.build_rubric_and_questions(
+        job_description_id, rubric = single_flight.run(flight_key, lambda: services.prepare_job_description(
             current_user,
             jd_text=jd_text,
             jd_url=jd_url,
             role=role
-        )
-        return jsonify({'rubric': rubric, 'suggested_questions': first_questions}), 200
+        ))
+        return jsonify({
+            'job_description_id': job_description_id,
+            'rubric': rubric,
+            'suggested_questions': (rubric.get('questions') or [])[:3]
+        }), 200
     except Exception as e:
         current_app.logger.exception("prepare_interview failed")
         return jsonify({'error': 'Failed to prepare JD-aware rubric.'}), 500
@@ -72,35 +86,52 @@ def start_interview(current_user):
     if not interview or interview.user_id != current_user.id:
         return jsonify({'error': 'Interview session not found or unauthorized.'}), 404
 
-    # deduct credits exactly once
+    job_description_id = data.get('job_description_id')
+    if job_description_id is not None:
+        try:
+            job_description_id = int(job_description_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'job_description_id must be an integer.'}), 400
+        if not JobDescription.query.get(job_description_id):
+            return jsonify({'error': 'Job description not found.'}), 404
+
+    # deduct credits exactly once; charge and claim are committed before the Gemini call below
     if interview.status == 'created':
-        user = User.query.get(current_user.id)
-        if user.free_interviews_remaining > 0:
-            user.free_interviews_remaining -= 1
-            interview.credit_type_used = 'free'
-        elif user.paid_interviews_remaining > 0:
-            user.paid_interviews_remaining -= 1
-            interview.credit_type_used = 'paid'
-        else:
+        credit_type = credits.start_interview(interview.id, current_user.id)
+        if credit_type is None:
+            db.session.rollback()
             return jsonify({'error': 'No interview credits remaining. Please purchase more.'}), 402
+        if credit_type != 'already_started':
+            interview.context = services.new_context()
+
+    token = interview_state.claim(interview.id, current_user.id)
+    if token is None:
+        return _claim_error(interview.id, current_user.id)
+    # checked under the claim, so a repeated or concurrent /start-interview can't add a second turn 1;
+    # a started interview without turns (its first question failed) may still be started again
+    if InterviewTurn.query.filter_by(interview_id=interview.id).first() is not None:
+        interview_state.release(interview.id, token)
+        db.session.commit()
+        return jsonify({'error': 'Interview has already started.'}), 409
 
+    if job_description_id is not None:
+        interview.job_description_id = job_description_id
     personality_key = data.get('interviewer_personality')
     interview.interviewer_personality = {'key': personality_key} if personality_key else {'key': 'sarah'}
     # always ensure it's a dict
     interview.user_data = data.get('user_data') or {}
-    interview.status = 'started'
+    db.session.commit()
+    invalidate_user(current_user.id)
+    interview_state.detach(interview)
 
-    first_question, topic = services.get_next_turn(interview)
+    with _released_on_error(interview.id, token):
+        first_question, topic = services.get_next_turn(interview)
 
-    # persist turn 1
-    turn = InterviewTurn(
-        interview_id=interview.id,
-        turn_no=1,
-        question=first_question,
-        topic=topic
-    )
-    db.session.add(turn)
-    db.session.commit()
+        # persist turn 1
+        if not _add_turn(interview, token, 1, first_question, topic):
+            return _claim_lost()
+        db.session.commit()
+    prefetch.schedule(interview.id, 1)
 
     return jsonify({
         'question': first_question,
@@ -108,70 +139,225 @@ def start_interview(current_user):
         'question_counter': 1
     }), 200
 
-@interviews_bp.route('/submit-answer', methods=['POST'])
-@token_required
-def submit_answer(current_user):
-    data = request.get_json() or {}
-    session_id = data.get('session_id')
-    answer_text = data.get('answer')
-    audio_data_url = data.get('audio_data')
+def _on_interview_completed(interview):
+    """Call before committing the 'completed' status."""
+    prefetch.discard(interview.id)
+    if jobs.enabled():
+        jobs.enqueue_session_report(interview)
 
+def _claim_error(interview_id, user_id):
+    status = interview_state.status(interview_id, user_id)
+    db.session.rollback()
+    if status is None:
+        return jsonify({'error': 'Interview session not found or unauthorized.'}), 404
+    if status == 'generating':
+        return jsonify({'error': 'An answer for this interview is already being processed.'}), 409
+    return jsonify({'error': 'Interview is not in progress.'}), 400
+
+def _claim_lost():
+    # cancelled (or taken over as stale) while STT/Gemini ran
+    db.session.rollback()
+    return jsonify({'error': 'Interview is no longer in progress.'}), 409
+
+@contextmanager
+def _released_on_error(interview_id, token):
+    """Gives the turn claim back if the rest of the turn fails (a no-op once it has finished)."""
     try:
-        interview = Interview.query.get(uuid.UUID(session_id))
-    except Exception:
-        interview = None
+        yield
+    except BaseException:
+        db.session.rollback()
+        interview_state.release(interview_id, token)
+        db.session.commit()
+        raise
 
-    if not interview or interview.user_id != current_user.id:
-        return jsonify({'error': 'Interview session not found or unauthorized.'}), 404
+def _claim_turn(current_user, session_id):
+    """
+    First phase of a turn: claims the interview (committed at once), then loads it
+    detached so no connection is held while STT / Gemini run.
+    Returns (error_response, interview, last_turn, token).
+    """
+    try:
+        interview_id = uuid.UUID(session_id)
+    except (TypeError, ValueError, AttributeError):
+        return (jsonify({'error': 'Interview session not found or unauthorized.'}), 404), None, None, None
+
+    token = interview_state.claim(interview_id, current_user.id)
+    if token is None:
+        return _claim_error(interview_id, current_user.id), None, None, None
+    db.session.commit()
 
-    # find current turn (last)
-    last_turn = InterviewTurn.query.filter_by(interview_id=interview.id).order_by(InterviewTurn.turn_no.desc()).first()
+    interview = Interview.query.get(interview_id)
+    last_turn = interview_state.detach(interview)
     if not last_turn:
-        return jsonify({'error': 'Interview has no active question.'}), 400
+        interview_state.release(interview_id, token)
+        db.session.commit()
+        return (jsonify({'error': 'Interview has no active question.'}), 400), None, None, None
+    return None, interview, last_turn, token
 
-    if audio_data_url:
-        transcript = services.transcribe_audio_data(audio_data_url)
+def _record_answer(current_user, data):
+    """
+    Shared first half of submit-answer: claims the interview, transcribes audio and
+    stores the answer + metrics on the current turn.
+    Returns (error_response, context) where context carries what the caller needs next;
+    the caller finishes the turn (interview_state.finish) or releases the claim.
+    """
+    answer_text = data.get('answer')
+    audio_data_url = data.get('audio_data')
+    use_uploaded_audio = bool(data.get('audio_upload'))
+
+    error, interview, last_turn, token = _claim_turn(current_user, data.get('session_id'))
+    if error:
+        return error, None
+
+    with _released_on_error(interview.id, token):
+        transcript, audio_path = None, None
+        try:
+            if use_uploaded_audio:
+                audio_path = audio_upload.find_upload(interview.id, last_turn.turn_no)
+                if audio_path:
+                    transcript = audio_upload.take_transcript(audio_path)
+            elif audio_data_url:
+                audio_path = services.write_audio_data_url(audio_data_url)
+                if audio_path:
+                    transcript = services.transcribe_audio_file(audio_path)
+        except TranscriptionBusy as e:
+            # keep a chunked upload so the retry can use it; inline audio comes again with the retry
+            if audio_path and not use_uploaded_audio:
+                audio_upload.discard(audio_path)
+            interview_state.release(interview.id, token)
+            db.session.commit()
+            response = jsonify({'error': 'Transcription is busy, please retry shortly.'})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return (response, 503), None
         if transcript:
             answer_text = transcript
 
-    # simple speaking metrics (fast win)
-    wpm, fillers = services.quick_speaking_metrics(answer_text or "")
-
-    # update last turn with answer and metrics
-    last_turn.answer = answer_text
-    last_turn.wpm = wpm
-    last_turn.filler_count = fillers
-    db.session.commit()
+        # tokenized once; reused by metrics, live feedback and pronunciation tips
+        analysis = services.analyze_answer(interview, answer_text or "")
+
+        # speaking metrics from the same audio STT just read (text-only estimate without audio)
+        speech = services.speaking_metrics(answer_text or "", audio_path, analysis)
+        if audio_path:
+            audio_upload.discard(audio_path)
+
+        # update last turn with answer and metrics (short write; the claim stays held)
+        interview_state.update_turn(
+            last_turn.id,
+            answer=answer_text,
+            wpm=speech['wpm'],
+            filler_count=speech['filler_count'],
+            duration_ms=speech['duration_ms']
+        )
+        services.context_set_answer(interview, last_turn.turn_no, answer_text)
+        if not interview_state.write(interview.id, token, context=interview.context):
+            return _claim_lost(), None
+        db.session.commit()
 
     # live feedback + pronunciation
-    live_feedback = services.get_live_feedback(interview, answer_text)
-    pronunciation_tips = services.analyze_pronunciation(answer_text or "")
+    live_feedback = services.get_live_feedback(interview, answer_text, analysis)
+    pronunciation_tips = services.analyze_pronunciation(answer_text or "", analysis)
 
     # ---- CHANGED (guard user_data) ----
     user_exp = (interview.user_data or {}).get("experience")
     total_turns = services.INTERVIEW_PHASES["conversation"]["questions"](user_exp)
-    current_turn_no = last_turn.turn_no
     # -----------------------------------
 
-    if current_turn_no >= total_turns:
-        interview.status = 'completed'
-        db.session.commit()
-        return jsonify({
-            'interview_complete': True,
-            'feedback': live_feedback,
-            'pronunciation_tips': pronunciation_tips
-        }), 200
-
-    next_question, topic = services.get_next_turn(interview)
-
-    new_turn = InterviewTurn(
+    return None, {
+        'interview': interview,
+        'token': token,
+        'current_turn_no': last_turn.turn_no,
+        'total_turns': total_turns,
+        'live_feedback': live_feedback,
+        'pronunciation_tips': pronunciation_tips,
+        'speaking_metrics': speech,
+    }
+
+def _complete_turn(interview, token):
+    """Last turn answered: generating -> completed. False if the claim was lost."""
+    if not interview_state.finish(interview.id, token, status='completed', context=interview.context):
+        return False
+    _on_interview_completed(interview)
+    return True
+
+def _add_turn(interview, token, turn_no, question, topic):
+    """Persists the next question and ends the turn: generating -> started."""
+    db.session.add(InterviewTurn(
         interview_id=interview.id,
-        turn_no=current_turn_no + 1,
-        question=next_question,
+        turn_no=turn_no,
+        question=question,
         topic=topic
-    )
-    db.session.add(new_turn)
-    db.session.commit()
+    ))
+    services.context_add_question(interview, turn_no, question, topic)
+    return interview_state.finish(interview.id, token, context=interview.context)
+
+@interviews_bp.route('/audio-chunk', methods=['POST'])
+@token_required
+def upload_audio_chunk(current_user):
+    """
+    Raw binary audio chunk for the current turn (see backend/audio_upload.py).
+    Query: session_id, turn_no, offset, final=1 on the last chunk, ext (default webm).
+    Then call /submit-answer with "audio_upload": true instead of "audio_data".
+    """
+    try:
+        interview = Interview.query.get(uuid.UUID(request.args.get('session_id', '')))
+        turn_no = int(request.args.get('turn_no', ''))
+        offset = int(request.args.get('offset', '0'))
+    except (ValueError, TypeError):
+        return jsonify({'error': 'session_id, turn_no and offset are required.'}), 400
+
+    if not interview or interview.user_id != current_user.id:
+        return jsonify({'error': 'Interview session not found or unauthorized.'}), 404
+    if interview.status != 'started':
+        return jsonify({'error': 'Interview is not in progress.'}), 400
+    current_turn_no = (db.session.query(db.func.max(InterviewTurn.turn_no))
+                       .filter(InterviewTurn.interview_id == interview.id)
+                       .scalar())
+    if turn_no != current_turn_no:
+        return jsonify({'error': 'Audio can only be uploaded for the current question.',
+                        'turn_no': current_turn_no}), 409
+
+    try:
+        size = audio_upload.append_chunk(interview.id, turn_no, offset, request.stream)
+        final = request.args.get('final', '').lower() in ('1', 'true', 'yes')
+        if final:
+            audio_upload.finalize(interview.id, turn_no, request.args.get('ext'))
+    except audio_upload.UploadError as e:
+        return jsonify({'error': str(e), 'size': e.size}), e.status
+
+    return jsonify({'size': size, 'final': final}), 200
+
+@interviews_bp.route('/submit-answer', methods=['POST'])
+@token_required
+def submit_answer(current_user):
+    data = request.get_json() or {}
+    error, ctx = _record_answer(current_user, data)
+    if error:
+        return error
+
+    interview, token = ctx['interview'], ctx['token']
+    current_turn_no = ctx['current_turn_no']
+    live_feedback = ctx['live_feedback']
+    pronunciation_tips = ctx['pronunciation_tips']
+
+    with _released_on_error(interview.id, token):
+        if current_turn_no >= ctx['total_turns']:
+            if not _complete_turn(interview, token):
+                return _claim_lost()
+            db.session.commit()
+            return jsonify({
+                'interview_complete': True,
+                'feedback': live_feedback,
+                'pronunciation_tips': pronunciation_tips,
+                'speaking_metrics': ctx['speaking_metrics']
+            }), 200
+
+        prepared = prefetch.take(interview.id, current_turn_no, 'follow_up')
+        next_question, topic = prepared or services.get_next_turn(interview)
+
+        if not _add_turn(interview, token, current_turn_no + 1, next_question, topic):
+            return _claim_lost()
+        db.session.commit()
+    prefetch.schedule(interview.id, current_turn_no + 1)
 
     return jsonify({
         'question': next_question,
@@ -179,50 +365,136 @@ def submit_answer(current_user):
         'question_counter': current_turn_no + 1,
         'feedback': live_feedback,
         'pronunciation_tips': pronunciation_tips,
+        'speaking_metrics': ctx['speaking_metrics'],
         'interview_complete': False
     }), 200
 
-@interviews_bp.route('/skip-question', methods=['POST'])
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@interviews_bp.route('/submit-answer/stream', methods=['POST'])
 @token_required
-def skip_question(current_user):
+def submit_answer_stream(current_user):
+    """
+    Same contract as /submit-answer, delivered as Server-Sent Events:
+    - `feedback`: live feedback + pronunciation tips, sent as soon as the answer is stored
+    - `token`:    next-question text deltas as Gemini streams them
+    - `replace`:  the streamed question failed part-way or repeats an earlier one; drop
+                  the tokens shown so far and show `question` instead
+    - `question`: the persisted next question (same fields as /submit-answer)
+    - `complete`: sent instead of token/question when the interview is finished
+    - `error`:    the interview was cancelled while the next question was being generated
+    """
     data = request.get_json() or {}
-    session_id = data.get('session_id')
-
-    try:
-        interview = Interview.query.get(uuid.UUID(session_id))
-    except Exception:
-        interview = None
-
-    if not interview or interview.user_id != current_user.id:
-        return jsonify({'error': 'Interview session not found or unauthorized.'}), 404
-
-    last_turn = InterviewTurn.query.filter_by(interview_id=interview.id).order_by(InterviewTurn.turn_no.desc()).first()
-    if not last_turn:
-        return jsonify({'error': 'Interview has no active question.'}), 400
+    error, ctx = _record_answer(current_user, data)
+    if error:
+        return error
+
+    def events():
+        interview, token = ctx['interview'], ctx['token']
+        current_turn_no = ctx['current_turn_no']
+        with _released_on_error(interview.id, token):
+            yield _sse('feedback', {
+                'feedback': ctx['live_feedback'],
+                'pronunciation_tips': ctx['pronunciation_tips'],
+                'speaking_metrics': ctx['speaking_metrics']
+            })
+
+            if current_turn_no >= ctx['total_turns']:
+                if not _complete_turn(interview, token):
+                    db.session.rollback()
+                    yield _sse('error', {'error': 'Interview is no longer in progress.'})
+                    return
+                db.session.commit()
+                yield _sse('complete', {'interview_complete': True})
+                return
+
+            # a prefetched or banked question is already complete, so it goes out as one delta
+            prepared = (prefetch.take(interview.id, current_turn_no, 'follow_up')
+                        or question_bank.next_question(interview))
+            if prepared:
+                next_question, topic = prepared
+                yield _sse('token', {'delta': next_question})
+            else:
+                deltas, meta, failed = [], {}, False
+                try:
+                    for delta in services.stream_next_turn(interview, meta):
+                        deltas.append(delta)
+                        yield _sse('token', {'delta': delta})
+                except Exception as e:
+                    current_app.logger.error(f"Streaming next question failed: {e}")
+                    failed = True
+
+                next_question = "".join(deltas).strip()
+                topic = meta.get('topic') or 'general'
+                if failed or meta.get('repeat'):
+                    # a cut-off question is never stored, and a streamed one could only be checked
+                    # for repeats once complete; either way ask for a whole, checked one instead
+                    try:
+                        next_question, topic = services.get_next_turn(interview)
+                    except Exception as e:
+                        current_app.logger.error(f"Regenerating the streamed question failed: {e}")
+                        next_question, topic = services.FALLBACK_QUESTION
+                    if deltas:
+                        yield _sse('replace', {'question': next_question})
+                    else:
+                        yield _sse('token', {'delta': next_question})
+                elif not next_question:
+                    next_question, topic = services.FALLBACK_QUESTION
+
+            if not _add_turn(interview, token, current_turn_no + 1, next_question, topic):
+                db.session.rollback()
+                yield _sse('error', {'error': 'Interview is no longer in progress.'})
+                return
+            db.session.commit()
+        prefetch.schedule(interview.id, current_turn_no + 1)
+
+        yield _sse('question', {
+            'question': next_question,
+            'phase': 'conversation',
+            'question_counter': current_turn_no + 1,
+            'interview_complete': False
+        })
 
-    last_turn.answer = "(Question Skipped)"
-    db.session.commit()
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
-    # ---- CHANGED (guard user_data) ----
-    user_exp = (interview.user_data or {}).get("experience")
-    total_turns = services.INTERVIEW_PHASES["conversation"]["questions"](user_exp)
-    current_turn_no = last_turn.turn_no
-    # -----------------------------------
-
-    if current_turn_no >= total_turns:
-        interview.status = 'completed'
+@interviews_bp.route('/skip-question', methods=['POST'])
+@token_required
+def skip_question(current_user):
+    data = request.get_json() or {}
+    error, interview, last_turn, token = _claim_turn(current_user, data.get('session_id'))
+    if error:
+        return error
+
+    with _released_on_error(interview.id, token):
+        # written with the turn's outcome; the rephrased question's prompt already sees it
+        skipped = "(Question Skipped)"
+        services.context_set_answer(interview, last_turn.turn_no, skipped)
+
+        # ---- CHANGED (guard user_data) ----
+        user_exp = (interview.user_data or {}).get("experience")
+        total_turns = services.INTERVIEW_PHASES["conversation"]["questions"](user_exp)
+        current_turn_no = last_turn.turn_no
+        # -----------------------------------
+
+        if current_turn_no >= total_turns:
+            interview_state.update_turn(last_turn.id, answer=skipped)
+            if not _complete_turn(interview, token):
+                return _claim_lost()
+            db.session.commit()
+            return jsonify({'interview_complete': True}), 200
+
+        prepared = prefetch.take(interview.id, current_turn_no, 'skip')
+        next_question, topic = prepared or services.get_next_turn(interview, force_rephrase=True)
+
+        interview_state.update_turn(last_turn.id, answer=skipped)
+        if not _add_turn(interview, token, current_turn_no + 1, next_question, topic):
+            return _claim_lost()
         db.session.commit()
-        return jsonify({'interview_complete': True}), 200
-
-    next_question, topic = services.get_next_turn(interview, force_rephrase=True)
-    new_turn = InterviewTurn(
-        interview_id=interview.id,
-        turn_no=current_turn_no + 1,
-        question=next_question,
-        topic=topic
-    )
-    db.session.add(new_turn)
-    db.session.commit()
+    prefetch.schedule(interview.id, current_turn_no + 1)
 
     return jsonify({
         'question': next_question,
@@ -244,19 +516,13 @@ def cancel_interview(current_user):
     if not interview or interview.user_id != current_user.id:
         return jsonify({'error': 'Interview session not found or unauthorized.'}), 404
 
-    if interview.status not in ['created', 'started']:
+    # refunds exactly the credit used, and only once however many cancels race
+    if not credits.cancel_interview(interview.id, current_user.id):
+        db.session.rollback()
         return jsonify({'error': 'Cannot cancel a completed interview.'}), 400
-
-    # refund exactly the credit used
-    if interview.status == 'started' and interview.credit_type_used:
-        user = User.query.get(current_user.id)
-        if interview.credit_type_used == 'free':
-            user.free_interviews_remaining += 1
-        elif interview.credit_type_used == 'paid':
-            user.paid_interviews_remaining += 1
-
-    interview.status = 'cancelled'
     db.session.commit()
+    invalidate_user(current_user.id)
+    prefetch.discard(interview.id)
 
     return jsonify({'message': 'Interview cancelled and credit refunded.'}), 200
 
@@ -274,40 +540,118 @@ def get_feedback(current_user):
     if not interview or interview.user_id != current_user.id:
         return jsonify({'error': 'Interview session not found or unauthorized.'}), 404
 
-    if not interview.detailed_feedback:
-        detailed_feedback, overall_score = services.generate_final_feedback(interview)
-        interview.detailed_feedback = detailed_feedback
-        interview.overall_score = overall_score
-        interview.status = 'completed'
+    if not interview.detailed_feedback and jobs.enabled():
+        # computed by the job worker; the client polls /jobs/<id> and asks again
+        job = jobs.requeue(jobs.enqueue('final_feedback', f"final_feedback:{interview.id}",
+                                        {'interview_id': str(interview.id)}, user_id=current_user.id))
         db.session.commit()
+        if job.status != 'succeeded':
+            return jsonify({'status': job.status, 'job_id': job.id}), 202
+        db.session.refresh(interview)
+
+    detailed_feedback, overall_score = interview.detailed_feedback, interview.overall_score
+    if not detailed_feedback:
+        def generate():
+            feedback, score = services.generate_final_feedback(interview)
+            interview.detailed_feedback = feedback
+            interview.overall_score = score
+            interview.status = 'completed'
+            db.session.commit()
+            return feedback, score
+
+        def stored():
+            db.session.refresh(interview)
+            return (interview.detailed_feedback, interview.overall_score) if interview.detailed_feedback else None
+
+        detailed_feedback, overall_score = single_flight.run(f"final_feedback:{interview.id}", generate, recheck=stored)
 
     return jsonify({
-        'detailed_feedback': interview.detailed_feedback,
-        'overall_score': interview.overall_score
+        'detailed_feedback': detailed_feedback,
+        'overall_score': overall_score
     }), 200
 
+@interviews_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@token_required
+def get_job_status(current_user, job_id):
+    job = Job.query.get(job_id)
+    if not job or job.user_id != current_user.id:
+        return jsonify({'error': 'Job not found.'}), 404
+    return jsonify({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'error': job.last_error if job.status == 'failed' else None
+    }), 200
+
+def _encode_history_cursor(interview):
+    raw = f"{interview.created_at.isoformat()}|{interview.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_history_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    created_at, interview_id = raw.split('|', 1)
+    return datetime.fromisoformat(created_at), uuid.UUID(interview_id)
+
 @interviews_bp.route('/history', methods=['GET'])
 @token_required
 def get_history(current_user):
-    interviews = (Interview.query
-                  .filter_by(user_id=current_user.id)
-                  .filter(Interview.status == 'completed')
-                  .order_by(Interview.created_at.desc())
-                  .all())
+    """
+    Completed interviews, newest first, keyset-paginated on (created_at, id).
+    Query: ?limit=<n>&cursor=<opaque>&summary=1
+    The body stays a plain list; the cursor for the next page (if any) is in X-Next-Cursor.
+    Without limit or cursor the whole history is returned, as before pagination.
+    summary=1 omits turn bodies. Totals and scores for a dashboard: /history/stats.
+    """
+    paginated = 'limit' in request.args or 'cursor' in request.args
+    page_size = current_app.config.get('HISTORY_PAGE_SIZE', 50)
+    try:
+        limit = max(1, min(int(request.args.get('limit', page_size)), current_app.config.get('HISTORY_MAX_PAGE_SIZE', 100)))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    summary_only = request.args.get('summary', '').lower() in ('1', 'true', 'yes')
+
+    query = (Interview.query
+             .filter_by(user_id=current_user.id)
+             .filter(Interview.status == 'completed'))
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = _decode_history_cursor(cursor)
+        except Exception:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(db.tuple_(Interview.created_at, Interview.id) < (cursor_created_at, cursor_id))
+
+    query = query.order_by(Interview.created_at.desc(), Interview.id.desc())
+    if paginated:
+        # one extra row tells us whether there is a next page
+        interviews = query.limit(limit + 1).all()
+        has_more = len(interviews) > limit
+        interviews = interviews[:limit]
+    else:
+        interviews, has_more = query.all(), False
+
+    turns_by_interview = {}
+    if not summary_only and interviews:
+        turns = (InterviewTurn.query
+                 .filter(InterviewTurn.interview_id.in_([i.id for i in interviews]))
+                 .order_by(InterviewTurn.interview_id, InterviewTurn.turn_no.asc())
+                 .all())
+        for t in turns:
+            turns_by_interview.setdefault(t.interview_id, []).append(t)
 
     history_data = []
     for interview in interviews:
-        turns = (InterviewTurn.query
-                 .filter_by(interview_id=interview.id)
-                 .order_by(InterviewTurn.turn_no.asc())
-                 .all())
-        history_data.append({
+        item = {
             'id': str(interview.id),
             'created_at': interview.created_at.isoformat(),
             'user_data': interview.user_data,
             'mode': interview.mode,
             'overall_score': interview.overall_score,
-            'turns': [{
+        }
+        if not summary_only:
+            item['turns'] = [{
                 'turn_no': t.turn_no,
                 'q': t.question,
                 'a': t.answer,
@@ -315,9 +659,28 @@ def get_history(current_user):
                 'wpm': t.wpm,
                 'filler_count': t.filler_count,
                 'score': t.score
-            } for t in turns]
-        })
-    return jsonify(history_data), 200
+            } for t in turns_by_interview.get(interview.id, [])]
+        history_data.append(item)
+
+    response = jsonify(history_data)
+    if has_more:
+        response.headers['X-Next-Cursor'] = _encode_history_cursor(interviews[-1])
+    return response, 200
+
+@interviews_bp.route('/history/stats', methods=['GET'])
+@token_required
+def get_history_stats(current_user):
+    """Totals over all completed interviews (one aggregate query): count, best and average score."""
+    completed, best, average = (db.session.query(db.func.count(Interview.id),
+                                                 db.func.max(Interview.overall_score),
+                                                 db.func.avg(Interview.overall_score))
+                                .filter(Interview.user_id == current_user.id, Interview.status == 'completed')
+                                .one())
+    return jsonify({
+        'completed': completed,
+        'best_score': best,
+        'average_score': round(float(average), 2) if average is not None else None
+    }), 200
 
 @interviews_bp.route('/detail', methods=['GET'])
 @token_required
@@ -354,22 +717,29 @@ def get_detail(current_user):
             }
         }), 402
 
-    turns = (InterviewTurn.query
-             .filter_by(interview_id=interview.id)
-             .order_by(InterviewTurn.turn_no.asc())
-             .all())
+    transcript = jobs.session_transcript(interview)
+
+    # generated once and persisted, so repeat views are a single row read
+    suggestions, suggestions_job = interview.suggestions, None
+    if not suggestions and jobs.enabled():
+        suggestions_job = jobs.requeue(jobs.enqueue('post_session_suggestions',
+                                                    f"post_session_suggestions:{interview.id}",
+                                                    {'interview_id': str(interview.id)}, user_id=current_user.id))
+        db.session.commit()
+        if suggestions_job.status == 'succeeded':
+            db.session.refresh(interview)
+            suggestions, suggestions_job = interview.suggestions, None
+    elif not suggestions:
+        def generate():
+            interview.suggestions = services.generate_post_session_suggestions(interview, transcript)
+            db.session.commit()
+            return interview.suggestions
 
-    transcript = [{
-        'turn_no': t.turn_no,
-        'question': t.question,
-        'answer': t.answer,
-        'topic': t.topic,
-        'wpm': t.wpm,
-        'filler_count': t.filler_count,
-        'score': t.score
-    } for t in turns]
+        def stored():
+            db.session.refresh(interview)
+            return interview.suggestions or None
 
-    suggestions = services.generate_post_session_suggestions(interview, transcript)
+        suggestions = single_flight.run(f"post_session_suggestions:{interview.id}", generate, recheck=stored)
 
     return jsonify({
         'id': str(interview.id),
@@ -378,5 +748,6 @@ def get_detail(current_user):
         'overall_score': interview.overall_score,
         'user_data': interview.user_data,
         'transcript': transcript,
-        'suggestions': suggestions
+        'suggestions': suggestions,
+        'suggestions_job_id': suggestions_job.id if suggestions_job else None
     }), 200
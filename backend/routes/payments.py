@@ -6,8 +6,9 @@ from datetime import datetime
 import razorpay
 from flask import request, jsonify, Blueprint, current_app
 from ..app import db
-from ..models import User, Payment
-from .auth import token_required
+from ..models import Payment
+from .. import credits
+from .auth import token_required, invalidate_user
 
 payments_bp = Blueprint('payments', __name__)
 
@@ -80,30 +81,24 @@ def verify_payment(current_user):
             'razorpay_signature': razorpay_signature
         })
 
-        payment = Payment.query.filter_by(razorpay_order_id=razorpay_order_id).first()
-        if not payment:
-            return jsonify({'error': 'Payment record not found'}), 404
-        if payment.status == 'paid':
-            return jsonify({'message': 'Payment already processed.'}), 200
-
-        payment.razorpay_payment_id = razorpay_payment_id
-        payment.status = 'paid'
-        payment.signature_ok = True
-        db.session.commit()
-
-        product = _product()
-        user_to_update = User.query.get(current_user.id)
-        user_to_update.paid_interviews_remaining += product['credits_to_add']
+        # marks the order paid and adds credits in one transaction; a racing webhook can't double-grant
+        applied = credits.apply_payment(razorpay_order_id, razorpay_payment_id, _product()['credits_to_add'])
         db.session.commit()
+        if not applied:
+            if not Payment.query.filter_by(razorpay_order_id=razorpay_order_id).first():
+                return jsonify({'error': 'Payment record not found'}), 404
+            return jsonify({'message': 'Payment already processed.'}), 200
+        user_id, paid_remaining = applied
+        invalidate_user(user_id)
 
         return jsonify({
             'message': 'Payment successful! Interview credits added.',
-            'paid_interviews_remaining': user_to_update.paid_interviews_remaining
+            'paid_interviews_remaining': paid_remaining
         }), 200
 
     except razorpay.errors.SignatureVerificationError:
         payment = Payment.query.filter_by(razorpay_order_id=razorpay_order_id).first()
-        if payment:
+        if payment and payment.status != 'paid':
             payment.status = 'failed'
             payment.signature_ok = False
             db.session.commit()
@@ -130,17 +125,10 @@ def razorpay_webhook():
         order_id = entity.get('order_id')
         payment_id = entity.get('id')
 
-        payment = Payment.query.filter_by(razorpay_order_id=order_id).first()
-        if payment and payment.status != 'paid':
-            payment.razorpay_payment_id = payment_id
-            payment.status = 'paid'
-            payment.signature_ok = True
-            payment.raw_payload = json.dumps(event)
-            db.session.commit()
-
-            product = _product()
-            user = User.query.get(payment.user_id)
-            user.paid_interviews_remaining += product['credits_to_add']
-            db.session.commit()
+        applied = credits.apply_payment(order_id, payment_id, _product()['credits_to_add'],
+                                        raw_payload=json.dumps(event))
+        db.session.commit()
+        if applied:
+            invalidate_user(applied[0])
 
     return jsonify({'status': 'ok'}), 200
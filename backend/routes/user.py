@@ -2,7 +2,7 @@
 from flask import Blueprint, request, jsonify
 from ..app import db
 from ..models import User
-from .auth import token_required
+from .auth import token_required, invalidate_user
 from .. import services
 
 user_bp = Blueprint("user", __name__)
@@ -29,6 +29,7 @@ def update_me(current_user: User):
         if key in data:
             setattr(current_user, key, data[key])
     db.session.commit()
+    invalidate_user(current_user.id)
     return jsonify({"message": "Profile updated"}), 200
 
 @user_bp.post("/resume/extract")
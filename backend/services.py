@@ -1,6 +1,8 @@
 import os
 import re
 import json
+import time
+import hashlib
 import logging
 import random
 import requests
@@ -8,6 +10,8 @@ import base64
 import tempfile
 from difflib import SequenceMatcher
 from flask import current_app
+from .http_client import get_session
+from . import metrics, profiling, key_pool, jd_fetch, llm_cache, prompt_budget, json_extract, stt_pool, speech_metrics, text_analysis, question_index, question_bank
 
 try:
     from openai import OpenAI
@@ -46,128 +50,332 @@ INTERVIEW_PHASES = {
     "closing": {"questions": lambda exp: 1}
 }
 
-# --- Gemini rotation
-paid_key_index = 0
+# --- Gemini keys (scheduled by backend/key_pool.py)
+GEMINI_MODEL = "gemini-1.5-flash"
+GEMINI_BASE_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}"
 
-def call_gemini(prompt: str, user, max_tokens: int = 600, temperature: float = 0.9):
-    """
-    Calls Google Generative Language API (Gemini). Rotates keys for paid users on 429/errors.
-    Hardened to handle missing candidates/parts.
-    """
-    global paid_key_index
-    is_paid_user = user.paid_interviews_remaining > 0 if user else False
+def _gemini_payload(prompt: str, max_tokens: int, temperature: float):
+    return {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {"temperature": temperature, "topK": 40, "topP": 0.95, "maxOutputTokens": max_tokens}
+    }
+
+def _gemini_keys(user):
+    """Returns (pool, indexes of the keys this user may use)."""
     all_configured_keys = current_app.config.get('GEMINI_KEYS', [])
     if not all_configured_keys:
         raise RuntimeError("NO_SERVER_API_KEY: Gemini API keys are not configured in the .env file.")
+    is_paid_user = user.paid_interviews_remaining > 0 if user else False
+    free_keys = current_app.config.get('GEMINI_FREE_KEY_COUNT', 0)
+    count = len(all_configured_keys) if is_paid_user or not free_keys else min(free_keys, len(all_configured_keys))
+    return key_pool.get_pool(all_configured_keys), list(range(count))
+
+def _record_gemini(index, status, started):
+    """Per-key latency (to the first byte for streams) and outcome counts."""
+    metrics.observe('gemini_request_seconds', time.monotonic() - started, metrics.LATENCY_BUCKETS, {'key': index})
+    metrics.incr('gemini_requests', labels={'key': index, 'status': status})
+
+def _report_gemini_failure(pool, index, response):
+    if response.status_code == 429:
+        logger.warning(f"Rate limit hit for key index {index}. Cooling it down.")
+        pool.report(index, ok=False, throttled=True, retry_after=key_pool.parse_retry_after(response))
+    else:
+        logger.warning(f"Gemini returned {response.status_code} for key index {index}.")
+        pool.report(index, ok=False)
 
-    api_keys_to_try = all_configured_keys if is_paid_user else [all_configured_keys[0]]
-
-    for i in range(len(api_keys_to_try)):
-        current_index = (paid_key_index + i) % len(api_keys_to_try) if is_paid_user else 0
-        key_to_try = api_keys_to_try[current_index]
-
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={key_to_try}"
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {"temperature": temperature, "topK": 40, "topP": 0.95, "maxOutputTokens": max_tokens}
-        }
-
+def call_gemini(prompt: str, user, max_tokens: int = 600, temperature: float = 0.9):
+    """
+    Calls Google Generative Language API (Gemini). Each attempt takes the healthiest
+    key with rate budget left and moves to another on 429/errors.
+    Hardened to handle missing candidates/parts.
+    """
+    pool, allowed = _gemini_keys(user)
+    wait = current_app.config.get('GEMINI_KEY_WAIT_SECONDS', 2.0)
+    payload = _gemini_payload(prompt, max_tokens, temperature)
+    tried = set()
+
+    for _ in allowed:
+        current_index = pool.acquire(allowed, exclude=tried, wait=wait)
+        if current_index is None:
+            break
+        tried.add(current_index)
+        url = f"{GEMINI_BASE_URL}:generateContent?key={pool.keys[current_index]}"
+
+        started = time.monotonic()
         try:
-            response = requests.post(url, json=payload, headers={'Content-Type': 'application/json'}, timeout=45)
-            if response.status_code == 429:
-                logger.warning(f"Rate limit hit for key index {current_index}. Rotating key.")
-                if is_paid_user:
-                    paid_key_index = (paid_key_index + 1) % len(api_keys_to_try)
-                continue
-            response.raise_for_status()
-            data = response.json()
-            try:
-                text = data['candidates'][0]['content']['parts'][0]['text'].strip()
-                if text:
-                    return text
-            except (KeyError, IndexError, TypeError):
-                logger.error(f"Gemini response missing text: {data}")
-                # rotate key if paid; otherwise just continue to next loop (which ends) and raise
-                if is_paid_user:
-                    paid_key_index = (paid_key_index + 1) % len(api_keys_to_try)
-                continue
+            response = get_session().post(url, json=payload, headers={'Content-Type': 'application/json'}, timeout=45)
         except requests.RequestException as e:
             logger.error(f"Gemini request failed idx {current_index}: {e}")
-            if is_paid_user:
-                paid_key_index = (paid_key_index + 1) % len(api_keys_to_try)
+            _record_gemini(current_index, 'error', started)
+            pool.report(current_index, ok=False)
+            continue
+        _record_gemini(current_index, response.status_code, started)
+        if response.status_code >= 400:
+            _report_gemini_failure(pool, current_index, response)
+            continue
+        latency = time.monotonic() - started
+        try:
+            data = response.json()
+        except ValueError as e:  # a 200 with a non-JSON body (proxy error page, cut-off response)
+            logger.error(f"Gemini response idx {current_index} is not JSON: {e}")
+            pool.report(current_index, ok=False)
             continue
+        try:
+            text = data['candidates'][0]['content']['parts'][0]['text'].strip()
+        except (KeyError, IndexError, TypeError):
+            logger.error(f"Gemini response missing text: {data}")
+            text = ""
+        # the key is only healthy once it has produced usable text
+        pool.report(current_index, ok=bool(text), latency=latency)
+        if text:
+            return text
     raise RuntimeError("All Gemini API keys failed.")
 
-def _clean_json_text(raw: str) -> str:
-    txt = (raw or "").strip()
-    txt = re.sub(r"^```(?:json)?\s*", "", txt, flags=re.IGNORECASE)
-    txt = re.sub(r"\s*```$", "", txt)
-    return txt
+def stream_gemini(prompt: str, user, max_tokens: int = 600, temperature: float = 0.9):
+    """
+    Streaming variant of call_gemini (streamGenerateContent over SSE). Yields text
+    deltas as they arrive. Keys are rotated only until a stream opens; once text has
+    been yielded a failure is raised to the caller instead of silently restarting.
+    """
+    pool, allowed = _gemini_keys(user)
+    wait = current_app.config.get('GEMINI_KEY_WAIT_SECONDS', 2.0)
+    payload = _gemini_payload(prompt, max_tokens, temperature)
+    tried = set()
+
+    for _ in allowed:
+        current_index = pool.acquire(allowed, exclude=tried, wait=wait)
+        if current_index is None:
+            break
+        tried.add(current_index)
+        url = f"{GEMINI_BASE_URL}:streamGenerateContent?alt=sse&key={pool.keys[current_index]}"
+
+        started = time.monotonic()
+        try:
+            response = get_session().post(url, json=payload, headers={'Content-Type': 'application/json'},
+                                          timeout=45, stream=True)
+        except requests.RequestException as e:
+            logger.error(f"Gemini stream request failed idx {current_index}: {e}")
+            _record_gemini(current_index, 'error', started)
+            pool.report(current_index, ok=False)
+            continue
+        _record_gemini(current_index, response.status_code, started)
 
-def extract_json_object(raw: str):
-    cleaned = _clean_json_text(raw)
-    m = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    if not m:
-        return None
-    try:
-        return json.loads(m.group(0))
-    except json.JSONDecodeError:
-        return None
+        with response:
+            if response.status_code >= 400:
+                _report_gemini_failure(pool, current_index, response)
+                continue
+            # latency to the first byte of the stream, comparable with call_gemini's
+            pool.report(current_index, ok=True, latency=time.monotonic() - started)
+            yielded = False
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                try:
+                    chunk = json.loads(line[5:].strip())
+                    delta = chunk['candidates'][0]['content']['parts'][0].get('text', '')
+                except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+                    continue
+                if delta:
+                    yielded = True
+                    yield delta
+            if yielded:
+                return
+    raise RuntimeError("All Gemini API keys failed.")
+
+def extract_json_object(raw: str, required_keys=(), saves_retry=False):
+    """First JSON object in an LLM reply; tolerates fences, prose and truncation (see json_extract)."""
+    return json_extract.extract_object(raw, required_keys, saves_retry)
+
+def call_gemini_json(prompt: str, user, max_tokens: int = 600, temperature: float = 0.9,
+                     cache: bool = False, required_keys=(), saves_retry=False):
+    """
+    call_gemini + extract_json_object. With cache=True, a successfully parsed object
+    (containing required_keys) is stored in, and later served from, the LLM response cache.
+    saves_retry: the caller regenerates when this returns None (see json_extract.extract_object).
+    """
+    key = None
+    if cache:
+        key = llm_cache.make_key(prompt, GEMINI_MODEL, max_tokens=max_tokens, temperature=temperature)
+        cached = llm_cache.lookup(key)
+        if cached is not None:
+            return cached
+    obj = extract_json_object(call_gemini(prompt, user=user, max_tokens=max_tokens, temperature=temperature),
+                              required_keys, saves_retry)
+    if key and obj and all(k in obj for k in required_keys):
+        llm_cache.store(key, obj)
+    return obj
 
 def too_similar(q1, q2):
     if not q1 or not q2:
         return False
     return SequenceMatcher(None, q1.lower(), q2.lower()).ratio() > 0.85
 
-def _get_conversation_tail(interview, length=4):
+# --- Rolling conversation context
+# Kept on Interview.context and updated as turns are written, so building a prompt
+# needs no queries and its size stays bounded however long the session runs:
+#   {"turns": <questions asked>, "recent": [{"turn_no", "q", "a"}, ...last N], "topics": [...]}
+CONTEXT_TAIL_TURNS = 4
+CONTEXT_ANSWER_CHARS = 600
+CONTEXT_MAX_TOPICS = 12
+
+def new_context():
+    return {"turns": 0, "recent": [], "topics": []}
+
+def _context_from_turns(interview):
+    """Rebuild the rolling context from stored turns (interviews started before it existed)."""
     from .models import InterviewTurn
     turns = (InterviewTurn.query
              .filter_by(interview_id=interview.id)
-             .order_by(InterviewTurn.turn_no.desc())
-             .limit(length).all())
-    recent = list(reversed(turns))
-    return "\n".join([f"Q: {t.question}\nA: {t.answer or '[no answer]'}" for t in recent])
-
-def get_next_turn(interview, force_rephrase=False):
+             .order_by(InterviewTurn.turn_no.asc())
+             .all())
+    ctx = new_context()
+    for t in turns:
+        ctx = _context_with_question(ctx, t.turn_no, t.question, t.topic)
+        if t.answer:
+            ctx = _context_with_answer(ctx, t.turn_no, t.answer)
+    return ctx
+
+def _context_with_question(ctx, turn_no, question, topic):
+    recent = (ctx["recent"] + [{"turn_no": turn_no, "q": question, "a": None}])[-CONTEXT_TAIL_TURNS:]
+    topics = list(ctx["topics"])
+    if topic and topic not in topics:
+        topics = (topics + [topic])[-CONTEXT_MAX_TOPICS:]
+    return {"turns": max(ctx["turns"], turn_no), "recent": recent, "topics": topics}
+
+def _context_with_answer(ctx, turn_no, answer):
+    recent = [dict(r, a=(answer or "")[:CONTEXT_ANSWER_CHARS]) if r["turn_no"] == turn_no else r
+              for r in ctx["recent"]]
+    return dict(ctx, recent=recent)
+
+def ensure_context(interview):
+    if interview.context is None:
+        interview.context = _context_from_turns(interview)
+    return interview.context
+
+def context_add_question(interview, turn_no, question, topic=None):
+    # reassign rather than mutate: plain JSONB columns don't track in-place changes
+    interview.context = _context_with_question(ensure_context(interview), turn_no, question, topic)
+
+def context_set_answer(interview, turn_no, answer):
+    interview.context = _context_with_answer(ensure_context(interview), turn_no, answer)
+
+def _get_conversation_tail(interview):
+    recent = ensure_context(interview)["recent"]
+    return "\n".join([f"Q: {r['q']}\nA: {r['a'] or '[no answer]'}" for r in recent])
+
+def _build_next_turn_prompt(interview, streaming=False, speculative=False):
+    """Returns (prompt, conversation_tail, first_turn) for the next interviewer message."""
     # hardened: default personality even if field missing/None
     personality_key = (interview.interviewer_personality or {}).get('key') or 'sarah'
     p = INTERVIEWER_PERSONALITIES.get(personality_key, INTERVIEWER_PERSONALITIES['sarah'])
     user_name = (interview.user_data or {}).get('name', 'Candidate')
     user_role = (interview.user_data or {}).get('role', 'Software Engineer')
-    user_exp = normalize_experience((interview.user_data or {}).get('experience', 'Entry-level'))
 
-    from .models import InterviewTurn
-    first_turn = InterviewTurn.query.filter_by(interview_id=interview.id).count() == 0
+    ctx = ensure_context(interview)
+    first_turn = ctx["turns"] == 0
     conversation_tail = _get_conversation_tail(interview)
+    covered = f"Topics already covered: {', '.join(ctx['topics'])}. " if ctx["topics"] else ""
+    # interviews started from /prepare steer toward the JD's competencies
+    competencies = competency_names(interview.job_description) if interview.job_description_id else []
+    if competencies:
+        covered += f"Across the interview, probe these job competencies: {', '.join(competencies)}. "
+
+    # when streaming, "message" must come first so its text can be shown while the rest arrives
+    if streaming:
+        output_spec = 'Return JSON with a "message" key first, then a "topic" key.'
+    elif first_turn:
+        output_spec = 'Return JSON with a "message" key.'
+    else:
+        output_spec = 'Return JSON with "message" and "topic" keys.'
 
     if first_turn:
         prompt = (
             f"You are {p['name']} ({p['style']}). Start a job interview with {user_name} "
             f"for a {user_role} role. Greet them warmly and ask for a brief self-introduction. "
-            f"Keep it to 1-2 friendly sentences. Return JSON with a \"message\" key."
+            f"Keep it to 1-2 friendly sentences. {output_spec}"
+        )
+    elif speculative:
+        # generated while the candidate is still answering, so it must not hinge on that answer
+        prompt = (
+            f"You are {p['name']}, continuing an interview with {user_name}. "
+            f"Recent conversation: {conversation_tail}. {covered}"
+            f"The candidate is still answering the last question. Prepare the next question on a "
+            f"different topic that makes sense whatever they answer. {output_spec}"
         )
     else:
         prompt = (
             f"You are {p['name']}, continuing an interview with {user_name}. "
-            f"Recent conversation: {conversation_tail}. "
+            f"Recent conversation: {conversation_tail}. {covered}"
             f"Ask a natural, conversational follow-up question. Avoid repeating topics. "
-            f"If rephrasing, simplify. Return JSON with \"message\" and \"topic\" keys."
+            f"If rephrasing, simplify. {output_spec}"
         )
-
-    for _ in range(3):
-        raw_response = call_gemini(prompt, user=interview.user, max_tokens=200, temperature=0.85)
-        response_obj = extract_json_object(raw_response)
+    return prompt, conversation_tail, first_turn
+
+FALLBACK_QUESTION = ("So, tell me about a time you faced a challenge at work.", "problem-solving")
+
+def _is_repeat(interview, question_text, conversation_tail, first_turn):
+    """Asked already: within this session's tail, or (past the greeting) near any question this user was asked."""
+    if conversation_tail and question_text in conversation_tail:
+        return True
+    if not first_turn and question_index.is_duplicate(interview.user_id, question_text):
+        logger.info("Rejected near-duplicate question; regenerating.")
+        return True
+    return False
+
+def get_next_turn(interview, force_rephrase=False, speculative=False):
+    banked = question_bank.next_question(interview)
+    if banked:
+        return banked
+    prompt, conversation_tail, first_turn = _build_next_turn_prompt(interview, speculative=speculative)
+
+    for attempt in range(3):
+        # the greeting only depends on personality/name/role, so it is shared across sessions
+        response_obj = call_gemini_json(prompt, user=interview.user, max_tokens=200, temperature=0.85,
+                                         cache=first_turn and attempt == 0, required_keys=('message',),
+                                         saves_retry=True)
         if response_obj and 'message' in response_obj:
             question_text = response_obj['message'].strip()
-            # ensure non-duplicate
-            if not conversation_tail or question_text not in conversation_tail:
-                return question_text, response_obj.get('topic', 'general')
-    return ("So, tell me about a time you faced a challenge at work.", "problem-solving")
+            if _is_repeat(interview, question_text, conversation_tail, first_turn):
+                continue
+            return question_text, response_obj.get('topic', 'general')
+    return FALLBACK_QUESTION
 
-def get_live_feedback(interview, answer: str):
+def stream_next_turn(interview, meta=None):
+    """
+    Yields the next question's text deltas as Gemini produces them.
+    The caller joins the deltas; the topic (once streamed) is put in meta['topic'], and
+    meta['repeat'] is set when the whole question turns out to be one the user was
+    already asked (the caller should regenerate it, as get_next_turn would).
+    Raises RuntimeError (like call_gemini) when no key could open a stream, so the
+    caller can fall back to get_next_turn.
+    """
+    prompt, conversation_tail, first_turn = _build_next_turn_prompt(interview, streaming=True)
+    parser = json_extract.StreamParser()
+    shown = ""
+    for chunk in stream_gemini(prompt, user=interview.user, max_tokens=200, temperature=0.85):
+        obj = parser.feed(chunk)
+        message = obj.get('message') if isinstance(obj.get('message'), str) else ""
+        if len(message) > len(shown) and message.startswith(shown):
+            yield message[len(shown):]
+            shown = message
+        if meta is not None and isinstance(obj.get('topic'), str):
+            meta['topic'] = obj['topic']
+    if not shown:
+        # no JSON at all: the model answered in plain text
+        shown = parser.text.strip()
+        if shown:
+            yield shown
+    if meta is not None and shown.strip():
+        meta['repeat'] = _is_repeat(interview, shown.strip(), conversation_tail, first_turn)
+
+def analyze_answer(interview, answer: str):
+    """Tokenize + lexicon scan once per answer; pass the result to the helpers below."""
+    return text_analysis.analyze(answer, (interview.user_data or {}).get('language') if interview else None)
+
+def get_live_feedback(interview, answer: str, analysis=None):
     if not answer or not answer.strip():
         return "It's okay, take a moment to think. Try to structure your answer."
-    length = len(answer.strip())
+    length = (analysis or text_analysis.analyze(answer)).char_count
     if length < 50:
         return "Good start. Could you elaborate on that with a specific example?"
     elif length > 800:
@@ -175,14 +383,17 @@ def get_live_feedback(interview, answer: str):
     else:
         return "Good, that's a well-paced answer."
 
-def analyze_pronunciation(text: str):
-    feedback, tech_terms = [], {'algorithm': 'AL-guh-rith-um', 'api': 'AY-pee-eye', 'scalability': 'skay-luh-BIL-i-tee'}
+MAX_PRONUNCIATION_TIPS = 3
+
+def analyze_pronunciation(text: str, analysis=None):
+    """At most MAX_PRONUNCIATION_TIPS tips, one per term, in the order the terms were said."""
+    feedback = []
     if text:
-        words = set(re.findall(r"\b[\w']+\b", text.lower()))
-        for term, pronunciation in tech_terms.items():
-            if term in words:
-                feedback.append(f"Practice '{term}': say {pronunciation}.")
-        if 'um' in words or 'uh' in words or 'like' in words:
+        analysis = analysis or text_analysis.analyze(text)
+        limit = MAX_PRONUNCIATION_TIPS - 1 if analysis.fillers else MAX_PRONUNCIATION_TIPS
+        for term, pronunciation in list(analysis.terms.items())[:limit]:
+            feedback.append(f"Practice '{term}': say {pronunciation}.")
+        if analysis.fillers:
             feedback.append("Confident speaking tip: Try a brief pause instead of filler words.")
     return feedback
 
@@ -192,17 +403,20 @@ def generate_final_feedback(interview):
              .filter_by(interview_id=interview.id)
              .order_by(InterviewTurn.turn_no.asc())
              .all())
-    qa_pairs = "\n".join([
-        f"Q: {t.question}\nA: {t.answer or ''}"
+    qa_pairs = prompt_budget.fit_transcript([
+        (t.question, t.answer)
         for t in turns if (t.answer and t.answer != "(Question Skipped)")
     ])
     user_data = interview.user_data or {}
+    criteria = rubric_criteria(interview.job_description) if interview.job_description_id else []
+    rubric_line = f"Judge the answers against these job criteria: {', '.join(criteria)}. " if criteria else ""
     prompt = (
         f"As an expert career coach, provide a concise, actionable report in markdown for a mock interview for a "
         f"{user_data.get('role', 'Software Engineer')} role. Based ONLY on the transcript, include sections for "
-        f"Overall Summary, Strengths (2-3 bullets), and Areas for Improvement (2-3 bullets). "
+        f"Overall Summary, Strengths (2-3 bullets), and Areas for Improvement (2-3 bullets). {rubric_line}"
         f"End with a single line: 'Final Score: X.X/10'.\n\nTranscript:\n---\n{qa_pairs}\n---"
     )
+    prompt_budget.observe('final_feedback', prompt)
     feedback_text = call_gemini(prompt, user=interview.user, max_tokens=1000, temperature=0.7)
     score = 7.5
     score_match = re.search(r'Final Score:\s*(\d+(\.\d+)?)\s*/\s*10', feedback_text)
@@ -211,78 +425,124 @@ def generate_final_feedback(interview):
         feedback_text = feedback_text[:score_match.start()].strip()
     return feedback_text, score
 
-def _transcribe_openai(audio_bytes):
-    if not OpenAI or not current_app.config.get('OPENAI_API_KEY'):
+AUDIO_EXTENSIONS = {'audio/webm': '.webm', 'audio/ogg': '.ogg', 'audio/wav': '.wav', 'audio/x-wav': '.wav',
+                    'audio/wave': '.wav', 'audio/mpeg': '.mp3', 'audio/mp4': '.m4a', 'audio/flac': '.flac'}
+
+def _transcribe_openai(audio_path, api_key):
+    if not OpenAI or not api_key:
         logger.warning("OpenAI library or API key not available for STT.")
         return None
     try:
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".webm") as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_file.seek(0)
-            client = OpenAI(api_key=current_app.config['OPENAI_API_KEY'])
-            transcript = client.audio.transcriptions.create(model="whisper-1", file=tmp_file)
+        with open(audio_path, 'rb') as audio_file:
+            client = OpenAI(api_key=api_key)
+            transcript = client.audio.transcriptions.create(model="whisper-1", file=audio_file)
             return transcript.text.strip()
     except Exception as e:
         logger.error(f"OpenAI STT failed: {e}")
         return None
 
-def _transcribe_google(audio_bytes):
+def _transcribe_google(audio_path):
     if not sr:
         logger.warning("SpeechRecognition library not available.")
         return ""
     r = sr.Recognizer()
     try:
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".wav") as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_file.seek(0)
-            with sr.AudioFile(tmp_file.name) as source:
-                audio = r.record(source)
+        with sr.AudioFile(audio_path) as source:
+            audio = r.record(source)
         return r.recognize_google(audio)
     except Exception as e:
         logger.error(f"Google STT failed: {e}")
         return ""
 
-def transcribe_audio_data(audio_data_url: str):
-    try:
-        header, b64_data = audio_data_url.split(',', 1)
-        audio_bytes = base64.b64decode(b64_data)
-        provider = os.getenv('STT_PROVIDER', 'google').lower()
-
-        if provider == 'openai':
-            result = _transcribe_openai(audio_bytes)
-            if result is not None:
-                return result
-            logger.warning("OpenAI STT failed, falling back to Google.")
+def _run_stt(provider, audio_path, openai_api_key):
+    """Provider dispatch. Runs inside the transcription process pool, so no app context here."""
+    if provider == 'openai':
+        result = _transcribe_openai(audio_path, openai_api_key)
+        if result is not None:
+            return result
+        logger.warning("OpenAI STT failed, falling back to Google.")
+    return _transcribe_google(audio_path)
 
-        return _transcribe_google(audio_bytes)
+def transcribe_audio_file(audio_path: str):
+    """
+    Transcribes an audio file on disk with the configured STT provider (Google fallback).
+    Raises stt_pool.TranscriptionBusy when the transcription pool is saturated.
+    """
+    provider = os.getenv('STT_PROVIDER', 'google').lower()
+    started, result = time.monotonic(), 'error'
+    try:
+        with profiling.span('stt', provider):
+            text = stt_pool.run(_run_stt, provider, audio_path, current_app.config.get('OPENAI_API_KEY')) or ""
+        result = 'ok' if text else 'empty'
+        return text
+    except stt_pool.TranscriptionBusy:
+        result = 'busy'
+        raise
     except Exception as e:
+        result = 'error'
         logger.error(f"Audio transcription failed in the main function: {e}")
         return ""
+    finally:
+        # includes the wait for a pool process; a busy pool rejects immediately
+        if result != 'busy':
+            metrics.observe('stt_seconds', time.monotonic() - started, metrics.LATENCY_BUCKETS, {'provider': provider})
+        metrics.incr('stt_requests', labels={'provider': provider, 'result': result})
+
+def write_audio_data_url(audio_data_url: str):
+    """
+    Legacy inline upload (base64 data URL in the JSON body; prefer the chunked upload).
+    Decodes it to a temp file once so STT and speaking metrics read the same bytes.
+    The caller deletes the returned path.
+    """
+    try:
+        header, b64_data = audio_data_url.split(',', 1)
+        mime = header[5:].split(';', 1)[0].lower() if header.startswith('data:') else ''
+        with tempfile.NamedTemporaryFile(delete=False, suffix=AUDIO_EXTENSIONS.get(mime, '.webm')) as tmp_file:
+            tmp_file.write(base64.b64decode(b64_data))
+            return tmp_file.name
+    except Exception as e:
+        logger.error(f"Could not decode audio data URL: {e}")
+        return None
 
 # ---------- Differentiators ----------
 
-def quick_speaking_metrics(text: str):
+def quick_speaking_metrics(text: str, analysis=None):
     """Very simple WPM + filler count for fast win."""
-    words = len(re.findall(r"\b[\w']+\b", text))
+    analysis = analysis or text_analysis.analyze(text)
     # assume ~60s answer when no audio duration available
-    wpm = words  # ~words per minute proxy
-    fillers = len(re.findall(r"\b(um|uh|like)\b", text.lower()))
+    wpm = analysis.word_count  # ~words per minute proxy
+    fillers = len(analysis.fillers)
     return float(wpm), int(fillers)
 
-def _fetch_url_text(jd_url: str) -> str:
-    try:
-        r = requests.get(jd_url, timeout=15)
-        r.raise_for_status()
-        # naive extraction, better: use readability
-        return re.sub(r'<[^>]+>', ' ', r.text)
-    except Exception:
-        return ""
-
-def build_rubric_and_questions(user, jd_text: str = None, jd_url: str = None, role: str = 'Software Engineer'):
-    if not jd_text and jd_url:
-        jd_text = _fetch_url_text(jd_url)
-    jd_text = (jd_text or '')[:20000]
-
+def speaking_metrics(text: str, audio_path: str = None, analysis=None):
+    """
+    Per-answer speaking metrics. Uses the real audio (duration, WPM, pauses) when it
+    can be decoded, else the text-only estimate from quick_speaking_metrics.
+    """
+    analysis = analysis or text_analysis.analyze(text)
+    wpm, fillers = quick_speaking_metrics(text, analysis)
+    result = {'wpm': wpm, 'filler_count': fillers, 'duration_ms': None}
+    audio = speech_metrics.analyze_file(audio_path, analysis.word_count, fillers)
+    if audio:
+        result.update(audio)
+    return result
+
+# Bump when the rubric prompt or its output shape changes; stored rubrics of older
+# versions are then regenerated on demand.
+RUBRIC_VERSION = 1
+
+def jd_content_hash(jd_text: str) -> str:
+    normalized = re.sub(r"\s+", " ", (jd_text or "").lower()).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def _fallback_rubric(role):
+    return {"competencies": [], "rubric": [], "questions": [
+        f"Walk me through a recent project relevant to {role}.",
+        "Describe a challenging problem you solved and your impact.",
+        "How do you prioritize tasks when everything is urgent?"
+    ]}
+
+def _generate_rubric(user, jd_text):
     prompt = f"""
 You are a hiring expert. From the Job Description below, extract:
 1) top 6 competencies (name + behavioral & technical indicators),
@@ -293,15 +553,62 @@ Return strict JSON with keys: competencies (list), rubric (list of {{criterion,
 JD:
 {jd_text}
 """
-    raw = call_gemini(prompt, user=user, max_tokens=900, temperature=0.4)
-    obj = extract_json_object(raw)
-    if not obj:
-        obj = {"competencies": [], "rubric": [], "questions": [
-            f"Walk me through a recent project relevant to {role}.",
-            "Describe a challenging problem you solved and your impact.",
-            "How do you prioritize tasks when everything is urgent?"
-        ]}
-    return obj, obj.get('questions', [])[:3]
+    prompt_budget.observe('rubric', prompt)
+    obj = call_gemini_json(prompt, user=user, max_tokens=900, temperature=0.4,
+                           cache=True, required_keys=('questions',))
+    return obj if obj and obj.get('questions') else None
+
+def prepare_job_description(user, jd_text: str = None, jd_url: str = None, role: str = 'Software Engineer'):
+    """
+    Returns (job_description_id, rubric) for a JD. Rubrics are stored per JD content
+    hash, so the same JD (from any user, pasted or by URL) is only sent to Gemini once.
+    The fallback rubric is not stored and comes back with id None.
+    """
+    from sqlalchemy.exc import IntegrityError
+    from .app import db
+    from .models import JobDescription
+
+    if not jd_text and jd_url:
+        jd_text = jd_fetch.fetch_text(jd_url)
+    jd_text = prompt_budget.fit_document(jd_text)
+    if not jd_text:
+        return None, _fallback_rubric(role)
+
+    content_hash = jd_content_hash(jd_text)
+    jd = JobDescription.query.filter_by(content_hash=content_hash, version=RUBRIC_VERSION).first()
+    if jd is None:
+        obj = _generate_rubric(user, jd_text)
+        if not obj:
+            return None, _fallback_rubric(role)
+        jd = JobDescription(content_hash=content_hash, version=RUBRIC_VERSION, source_url=jd_url, role=role,
+                            text=jd_text, competencies=obj.get('competencies') or [],
+                            rubric=obj.get('rubric') or [], questions=obj.get('questions') or [])
+        try:
+            with db.session.begin_nested():
+                db.session.add(jd)
+        except IntegrityError:
+            # stored by a concurrent request for the same JD
+            jd = JobDescription.query.filter_by(content_hash=content_hash, version=RUBRIC_VERSION).first()
+        db.session.commit()
+    else:
+        metrics.incr('rubric_reused')
+    return jd.id, {"competencies": jd.competencies, "rubric": jd.rubric, "questions": jd.questions}
+
+def competency_names(job_description, limit=6):
+    names = []
+    for c in (job_description.competencies or [])[:limit] if job_description else []:
+        name = c.get('name') if isinstance(c, dict) else c
+        if isinstance(name, str) and name.strip():
+            names.append(name.strip())
+    return names
+
+def rubric_criteria(job_description):
+    criteria = []
+    for r in (job_description.rubric or []) if job_description else []:
+        name = r.get('criterion') if isinstance(r, dict) else r
+        if isinstance(name, str) and name.strip():
+            criteria.append(name.strip())
+    return criteria
 
 def extract_stories_from_resume(user, resume_text: str):
     prompt = f"""
@@ -314,10 +621,11 @@ Turn the resume text below into a STAR Story Bank. For each story, include:
 - tags (skills/competencies)
 Return JSON: stories: [ ... ].
 Resume:
-{resume_text}
+{prompt_budget.fit_document(resume_text)}
 """
-    raw = call_gemini(prompt, user=user, max_tokens=1000, temperature=0.5)
-    obj = extract_json_object(raw)
+    prompt_budget.observe('resume_stories', prompt)
+    obj = call_gemini_json(prompt, user=user, max_tokens=1000, temperature=0.5,
+                           cache=True, required_keys=('stories',))
     if not obj:
         obj = {"stories": []}
     return obj.get('stories', [])
@@ -327,13 +635,10 @@ def generate_post_session_suggestions(interview, transcript):
     Returns a dict with drills, follow_ups, and a short learning plan.
     Uses only transcript text + user_data. No DB changes required.
     """
-    qa_pairs = []
-    for t in transcript:
-        q = (t.get('question') or '').strip()
-        a = (t.get('answer') or '').strip()
-        if q:
-            qa_pairs.append(f"Q: {q}\nA: {a if a else '[no answer]'}")
-    joined = "\n\n".join(qa_pairs)
+    joined = prompt_budget.fit_transcript([
+        (t.get('question'), t.get('answer'))
+        for t in transcript if (t.get('question') or '').strip()
+    ])
 
     user_data = interview.user_data or {}
     role = user_data.get('role') or user_data.get('target_role') or "Software Engineer"
@@ -352,8 +657,9 @@ Transcript:
 {joined}
 ---
 """
+    prompt_budget.observe('post_session_suggestions', prompt)
     raw = call_gemini(prompt, user=interview.user, max_tokens=700, temperature=0.6)
-    obj = extract_json_object(raw)
+    obj = extract_json_object(raw, ('drills', 'follow_ups'))
     if not obj:
         obj = {
             "drills": [
@@ -0,0 +1,114 @@
+"""
+Single-flight coalescing for expensive, repeatable LLM work.
+
+run(key, fn) lets the first caller for a key (the leader) execute fn while
+concurrent callers in the same process wait and share its result, so a
+double-click or client retry on /get-feedback or /prepare costs one Gemini call.
+
+With SINGLE_FLIGHT_DB_LOCK on Postgres the leader also takes a lease on the key
+(a row in single_flight_leases), so leaders in other gunicorn workers queue behind
+it. Taking, polling and releasing the lease are each a short transaction: no pooled
+connection is held during the Gemini call. The lease expires after
+SINGLE_FLIGHT_LEASE_SECONDS, so a worker that dies holding it doesn't block the key.
+After getting the lease, `recheck()` is called first: it returns what the other
+worker stored (e.g. the persisted feedback), or None to go ahead and compute.
+"""
+import copy
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from flask import current_app, has_app_context
+from sqlalchemy import text
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+_lock = threading.Lock()
+_flights = {}
+
+def _setting(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+_ACQUIRE = text(
+    "INSERT INTO single_flight_leases (key, owner, expires_at)"
+    " VALUES (:key, :owner, now() + make_interval(secs => :ttl))"
+    " ON CONFLICT (key) DO UPDATE SET owner = EXCLUDED.owner, expires_at = EXCLUDED.expires_at"
+    " WHERE single_flight_leases.expires_at < now()"
+    " RETURNING owner"
+)
+_RELEASE = text("DELETE FROM single_flight_leases WHERE key = :key AND owner = :owner")
+
+def _try_lease(db, key, owner, ttl):
+    with db.engine.begin() as conn:
+        return conn.execute(_ACQUIRE, {'key': key, 'owner': owner, 'ttl': ttl}).first() is not None
+
+@contextmanager
+def _db_lock(key):
+    """Cross-worker lease on key; the connection goes back to the pool between statements."""
+    from .app import db
+    if not _setting('SINGLE_FLIGHT_DB_LOCK', False) or db.engine.dialect.name != 'postgresql':
+        yield
+        return
+    timeout = _setting('SINGLE_FLIGHT_TIMEOUT_SECONDS', 60)
+    ttl = _setting('SINGLE_FLIGHT_LEASE_SECONDS', 120)
+    owner = uuid.uuid4().hex
+    deadline = time.monotonic() + timeout
+    acquired = _try_lease(db, key, owner, ttl)
+    if not acquired:
+        metrics.incr('single_flight_db_waits')
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.2)
+        acquired = _try_lease(db, key, owner, ttl)
+    if not acquired:
+        # better a duplicate call than a request stuck behind a wedged worker
+        logger.warning(f"Lease for {key} not acquired in {timeout}s; computing anyway")
+    try:
+        yield
+    finally:
+        if acquired:
+            with db.engine.begin() as conn:
+                conn.execute(_RELEASE, {'key': key, 'owner': owner})
+
+def run(key, fn, recheck=None):
+    with _lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        metrics.incr('single_flight_shared')
+        if not flight.done.wait(_setting('SINGLE_FLIGHT_TIMEOUT_SECONDS', 60)):
+            logger.warning(f"Timed out waiting on in-flight {key}; computing separately")
+            return fn()
+        if flight.error is not None:
+            raise flight.error
+        # followers get their own copy so nobody mutates the leader's result
+        return copy.deepcopy(flight.result)
+
+    metrics.incr('single_flight_leaders')
+    try:
+        with _db_lock(key):
+            result = recheck() if recheck else None
+            if result is None:
+                result = fn()
+        flight.result = result
+        return result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            _flights.pop(key, None)
+        flight.done.set()
@@ -0,0 +1,112 @@
+"""
+Speaking analytics computed from the answer audio itself.
+
+The audio is decoded once to mono PCM (WAV natively, other containers through
+ffmpeg when it is installed) and analysed with vectorised NumPy over 20ms
+frames: true duration, speaking time, WPM and the distribution of pauses.
+Callers fall back to text-only metrics when analyze_file returns None.
+"""
+import os
+import wave
+import shutil
+import logging
+import subprocess
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 20
+MIN_PAUSE_MS = 300   # shorter silences are just gaps between words
+DECODE_RATE = 16000  # ffmpeg output rate; plenty for energy-based analysis
+
+def _decode_wav(path):
+    with wave.open(path, 'rb') as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        return None, rate
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+def _decode_ffmpeg(path):
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        return None, DECODE_RATE
+    proc = subprocess.run(
+        [ffmpeg, '-nostdin', '-v', 'error', '-i', path, '-f', 's16le', '-ac', '1', '-ar', str(DECODE_RATE), '-'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=30
+    )
+    if proc.returncode != 0:
+        logger.warning(f"ffmpeg could not decode {os.path.basename(path)}: {proc.stderr[:200]!r}")
+        return None, DECODE_RATE
+    return np.frombuffer(proc.stdout, dtype='<i2').astype(np.float32) / 32768.0, DECODE_RATE
+
+def decode_pcm(path):
+    """Returns (float32 mono samples in [-1, 1], sample_rate) or (None, rate) if undecodable."""
+    try:
+        with open(path, 'rb') as fh:
+            is_wav = fh.read(12)[8:12] == b'WAVE'
+        return _decode_wav(path) if is_wav else _decode_ffmpeg(path)
+    except Exception as e:
+        logger.warning(f"Audio decode failed: {e}")
+        return None, DECODE_RATE
+
+def analyze_pcm(samples, rate, word_count, filler_count=0):
+    frame = max(1, int(rate * FRAME_MS / 1000))
+    n_frames = len(samples) // frame
+    duration_ms = int(round(len(samples) * 1000.0 / rate))
+    if n_frames == 0:
+        return None
+
+    rms = np.sqrt(np.mean(np.square(samples[: n_frames * frame].reshape(n_frames, frame)), axis=1))
+    # adaptive threshold: well above the noise floor, but never above a fraction of the loud frames
+    floor = np.percentile(rms, 10)
+    loud = np.percentile(rms, 95)
+    threshold = max(floor * 3.0, loud * 0.1, 1e-4)
+    voiced = rms > threshold
+
+    # run-length encode silence: starts/ends of False runs
+    padded = np.concatenate(([1], voiced.astype(np.int8), [1]))
+    edges = np.diff(padded)
+    silent_runs = (np.flatnonzero(edges == 1) - np.flatnonzero(edges == -1)) * FRAME_MS
+    # leading/trailing silence is not a pause
+    if len(silent_runs) and not voiced[0]:
+        silent_runs = silent_runs[1:]
+    if len(silent_runs) and not voiced[-1]:
+        silent_runs = silent_runs[:-1]
+    pauses = silent_runs[silent_runs >= MIN_PAUSE_MS]
+
+    speaking_ms = int(voiced.sum()) * FRAME_MS
+    minutes = duration_ms / 60000.0
+    return {
+        'duration_ms': duration_ms,
+        'speaking_ms': speaking_ms,
+        'wpm': round(word_count / minutes, 1) if minutes else 0.0,
+        'articulation_wpm': round(word_count / (speaking_ms / 60000.0), 1) if speaking_ms else 0.0,
+        'fillers_per_min': round(filler_count / minutes, 2) if minutes else 0.0,
+        'pause_count': int(len(pauses)),
+        'pause_mean_ms': int(pauses.mean()) if len(pauses) else 0,
+        'pause_p90_ms': int(np.percentile(pauses, 90)) if len(pauses) else 0,
+        'longest_pause_ms': int(pauses.max()) if len(pauses) else 0,
+        'pause_ratio': round(1.0 - speaking_ms / float(n_frames * FRAME_MS), 3),
+    }
+
+def analyze_file(path, word_count, filler_count=0):
+    """Speaking metrics for an audio file, or None when NumPy/decoding is unavailable."""
+    if np is None or not path:
+        return None
+    samples, rate = decode_pcm(path)
+    if samples is None or not len(samples):
+        return None
+    return analyze_pcm(samples, rate, word_count, filler_count)
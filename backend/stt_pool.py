@@ -0,0 +1,108 @@
+"""
+Bounded process pool for speech-to-text.
+
+Decoding/recording audio is CPU-heavy and holds the GIL, so both STT backends
+run in a separate process pool instead of on the request thread. Admission is
+bounded (pool size + STT_POOL_QUEUE waiting jobs); beyond that callers get
+TranscriptionBusy, which the routes turn into 503 + Retry-After.
+"""
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionBusy(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Transcription capacity exhausted")
+        self.retry_after = retry_after
+
+class TranscriptionPool:
+    def __init__(self, workers=2, queue_size=4, timeout=60, start_method='spawn', retry_after=2):
+        self.workers = workers
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(max(1, workers) + queue_size)
+        self._executor_lock = threading.Lock()
+        self._executor = self._new_executor() if workers > 0 else None
+
+    def _new_executor(self):
+        # spawn, not fork: the web worker is multi-threaded and forking it is unsafe
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context(self.start_method))
+
+    def _replace_broken(self, broken):
+        """A worker process died (OOM, segfault in a decoder): the executor is unusable from then on."""
+        with self._executor_lock:
+            if self._executor is broken:
+                logger.error("Transcription pool broken; starting a new one")
+                self._executor = self._new_executor()
+                broken.shutdown(wait=False, cancel_futures=True)
+            return self._executor
+
+    def _submit(self, fn, *args):
+        """(executor, future), on a fresh executor if the current one is already broken."""
+        executor = self._executor
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool:
+            executor = self._replace_broken(executor)
+            return executor, executor.submit(fn, *args)
+
+    def run(self, fn, *args):
+        """Runs fn(*args) in the pool and waits for it; returns None if it times out or its worker dies."""
+        if not self._slots.acquire(blocking=False):
+            raise TranscriptionBusy(self.retry_after)
+        if self._executor is None:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        try:
+            executor, future = self._submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is held until the job really finishes, even if we stop waiting for it
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            logger.error(f"Transcription job exceeded {self.timeout}s; giving up on it")
+            return None
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            logger.error("Transcription worker died during the job")
+            return None
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+
+def get_pool():
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _lock:
+            if _pool is None or _pool_pid != os.getpid():
+                cfg = current_app.config if has_app_context() else {}
+                _pool = TranscriptionPool(
+                    workers=cfg.get('STT_POOL_SIZE', 2),
+                    queue_size=cfg.get('STT_POOL_QUEUE', 4),
+                    timeout=cfg.get('STT_TIMEOUT_SECONDS', 60),
+                    start_method=cfg.get('STT_POOL_START_METHOD', 'spawn'),
+                    retry_after=cfg.get('STT_RETRY_AFTER_SECONDS', 2),
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+def run(fn, *args):
+    return get_pool().run(fn, *args)
@@ -0,0 +1,110 @@
+"""
+Single-pass analysis of an answer transcript.
+
+The answer is tokenised once with a precompiled regex; a token-level trie built
+from the lexicon (backend/data/lexicon.json, or LEXICON_PATH) then finds every
+filler and pronunciation term, including multi-word ones, in one scan. Cost
+depends on answer length and the longest term, not on lexicon size.
+"""
+import os
+import re
+import json
+import logging
+import threading
+from collections import namedtuple
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\b[\w']+\b", re.UNICODE)
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), 'data', 'lexicon.json')
+
+# services.LANGUAGES values (and bare names) -> lexicon language codes
+LANGUAGE_CODES = {'en-us': 'en', 'en-in': 'en', 'en-gb': 'en', 'english': 'en',
+                  'hi-in': 'hi', 'hindi': 'hi',
+                  'es-es': 'es', 'spanish': 'es',
+                  'fr-fr': 'fr', 'french': 'fr'}
+
+AnswerAnalysis = namedtuple('AnswerAnalysis', 'text tokens word_count char_count fillers terms language')
+
+class TokenTrie:
+    """Trie over word tokens; find_all reports every (possibly multi-word) term in one pass."""
+    _END = object()
+
+    def __init__(self):
+        self.root = {}
+        self.max_depth = 0
+
+    def add(self, phrase, payload):
+        tokens = TOKEN_RE.findall(phrase.lower())
+        if not tokens:
+            return
+        node = self.root
+        for tok in tokens:
+            node = node.setdefault(tok, {})
+        node[self._END] = (phrase.lower(), payload)
+        self.max_depth = max(self.max_depth, len(tokens))
+
+    def find_all(self, tokens):
+        matches = []
+        root, end = self.root, self._END
+        for i in range(len(tokens)):
+            node = root.get(tokens[i])
+            j = i + 1
+            while node is not None:
+                if end in node:
+                    matches.append(node[end])
+                if j >= len(tokens) or j - i >= self.max_depth:
+                    break
+                node = node.get(tokens[j])
+                j += 1
+        return matches
+
+class Lexicon:
+    def __init__(self, data):
+        self.fillers = {}
+        self.terms = {}
+        for lang, words in (data.get('fillers') or {}).items():
+            trie = TokenTrie()
+            for w in words:
+                trie.add(w, None)
+            self.fillers[lang] = trie
+        for lang, entries in (data.get('pronunciations') or {}).items():
+            trie = TokenTrie()
+            for term, pronunciation in entries.items():
+                trie.add(term, pronunciation)
+            self.terms[lang] = trie
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as fh:
+            return cls(json.load(fh))
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+def get_lexicon():
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                path = current_app.config.get('LEXICON_PATH') if has_app_context() else None
+                _lexicon = Lexicon.load(path or DEFAULT_LEXICON_PATH)
+    return _lexicon
+
+def language_code(language):
+    """Lexicon code for a LANGUAGES name/locale ('Hindi', 'hi-IN', ...); English by default."""
+    lang = (language or '').strip().lower()
+    return LANGUAGE_CODES.get(lang) or (lang.split('-', 1)[0] if lang else 'en')
+
+def analyze(text, language=None):
+    text = text or ""
+    lang = language_code(language)
+    lexicon = get_lexicon()
+    tokens = TOKEN_RE.findall(text.lower())
+    empty = TokenTrie()
+    fillers = [m[0] for m in lexicon.fillers.get(lang, lexicon.fillers.get('en', empty)).find_all(tokens)]
+    terms = {}
+    for term, pronunciation in lexicon.terms.get(lang, lexicon.terms.get('en', empty)).find_all(tokens):
+        terms.setdefault(term, pronunciation)
+    return AnswerAnalysis(text, tokens, len(tokens), len(text.strip()), fillers, terms, lang)
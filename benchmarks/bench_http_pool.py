@@ -0,0 +1,100 @@
+"""
+Compare a bare requests.post per call (what call_gemini used to do) against the
+pooled keep-alive session from backend.http_client, using a local stub server.
+
+    python -m benchmarks.bench_http_pool --requests 300 --concurrency 8 --handshake-ms 40
+
+--handshake-ms delays every *new* connection on the server side to model the
+TCP+TLS setup cost to generativelanguage.googleapis.com. Pass --tls-cert/--tls-key
+to measure a real TLS handshake instead.
+"""
+import argparse
+import json
+import ssl
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import urllib3
+
+from backend.http_client import get_session, reset_session
+
+RESPONSE = json.dumps({"candidates": [{"content": {"parts": [{"text": "{\"message\": \"Hi\"}"}]}}]}).encode()
+
+def make_handler(handshake_ms, work_ms):
+    class StubGemini(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            if handshake_ms:
+                time.sleep(handshake_ms / 1000.0)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            self.rfile.read(length)
+            if work_ms:
+                time.sleep(work_ms / 1000.0)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(RESPONSE)))
+            self.end_headers()
+            self.wfile.write(RESPONSE)
+
+        def log_message(self, *args):
+            pass
+    return StubGemini
+
+def start_server(args):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.handshake_ms, args.work_ms))
+    server.daemon_threads = True
+    scheme = 'http'
+    if args.tls_cert:
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(args.tls_cert, args.tls_key)
+        server.socket = ctx.wrap_socket(server.socket, server_side=True)
+        scheme = 'https'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}/v1beta/models/stub:generateContent"
+
+def run(label, post, url, total, concurrency):
+    payload = {"contents": [{"parts": [{"text": "hello"}]}]}
+
+    def one(_):
+        t0 = time.perf_counter()
+        r = post(url, json=payload, timeout=30, verify=False)
+        r.raise_for_status()
+        return (time.perf_counter() - t0) * 1000.0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one, range(total)))
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:<8} n={total:<5} p50={p50:7.2f}ms  p99={p99:7.2f}ms  mean={statistics.fmean(latencies):7.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--handshake-ms', type=float, default=40.0)
+    parser.add_argument('--work-ms', type=float, default=5.0)
+    parser.add_argument('--tls-cert')
+    parser.add_argument('--tls-key')
+    args = parser.parse_args()
+
+    urllib3.disable_warnings()
+    server, url = start_server(args)
+    try:
+        run('before', requests.post, url, args.requests, args.concurrency)
+        reset_session()
+        session = get_session()
+        run('after', session.post, url, args.requests, args.concurrency)
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Simulated load against a local fake Gemini that enforces a per-key quota, to
+compare key scheduling policies end to end through services.call_gemini.
+
+    python -m benchmarks.bench_key_pool --keys 4 --key-rps 5 --calls 400 --concurrency 16 --processes 2
+
+The fake server gives every key a token bucket (--key-rps, --key-burst) and
+answers 429 with Retry-After + RetryInfo once it is drained. Key 1 is slow
+(--slow-ms) and key 2 fails --flaky-rate of its requests with a 500, so the
+health scoring has something to steer around.
+
+Policies:
+  pinned  free users on GEMINI_KEYS[0] only (GEMINI_FREE_KEY_COUNT=1), the old key choice
+  pooled  every key, scheduled by backend.key_pool
+With --processes > 1 each process is a separate "worker" sharing the sqlite key state.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+RESPONSE = json.dumps({"candidates": [{"content": {"parts": [{"text": "{\"message\": \"Hi\"}"}]}}]}).encode()
+
+def make_handler(args, stats, lock):
+    buckets = {}  # key -> [tokens, last]
+
+    class FakeGemini(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _reply(self, status, body, headers=()):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            key = parse_qs(urlparse(self.path).query).get('key', [''])[0]
+            now = time.monotonic()
+            with lock:
+                tokens, last = buckets.get(key, (args.key_burst, now))
+                tokens = min(args.key_burst, tokens + (now - last) * args.key_rps)
+                allowed = tokens >= 1
+                buckets[key] = (tokens - 1 if allowed else tokens, now)
+                stats['requests'] += 1
+                if not allowed:
+                    stats['throttled'] += 1
+            if not allowed:
+                wait = (1 - tokens) / args.key_rps
+                body = json.dumps({"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "details": [
+                    {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": f"{wait:.3f}s"}]}}).encode()
+                return self._reply(429, body, [('Retry-After', str(math.ceil(wait)))])
+            if key == 'key-2' and random.random() < args.flaky_rate:
+                with lock:
+                    stats['errors'] += 1
+                return self._reply(500, b'{"error": {"code": 500}}')
+            time.sleep((args.slow_ms if key == 'key-1' else args.work_ms) / 1000.0)
+            self._reply(200, RESPONSE)
+
+        def log_message(self, *a):
+            pass
+    return FakeGemini
+
+def start_server(args):
+    stats = {'requests': 0, 'throttled': 0, 'errors': 0}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args, stats, threading.Lock()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats, f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/fake"
+
+def worker(policy, base_url, state_path, args, calls, out):
+    os.environ.setdefault('DATABASE_URL', 'sqlite://')
+    from backend.app import create_app
+    from backend import services, key_pool
+    from backend.http_client import reset_session
+
+    app = create_app()
+    app.config.update(
+        GEMINI_KEYS=[f"key-{i}" for i in range(args.keys)],
+        GEMINI_FREE_KEY_COUNT=1 if policy == 'pinned' else 0,
+        GEMINI_KEY_STATE='sqlite', GEMINI_KEY_STATE_PATH=state_path,
+        GEMINI_KEY_RPM=args.key_rps * 60 * args.headroom, GEMINI_KEY_BURST=args.key_burst,
+        GEMINI_KEY_WAIT_SECONDS=args.wait, HTTP_RETRIES=0,
+    )
+    services.GEMINI_BASE_URL = base_url
+    key_pool.reset()
+    reset_session()
+    user = SimpleNamespace(paid_interviews_remaining=0)
+
+    def one(_):
+        with app.app_context():
+            t0 = time.perf_counter()
+            try:
+                services.call_gemini("hello", user=user)
+                return (time.perf_counter() - t0) * 1000.0
+            except RuntimeError:
+                return None
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        out.extend(pool.map(one, range(calls)))
+
+def _run_in_process(policy, base_url, state_path, args, calls, queue):
+    results = []
+    worker(policy, base_url, state_path, args, calls, results)
+    queue.put(results)
+
+def run(policy, args):
+    server, stats, base_url = start_server(args)
+    state_path = os.path.join(tempfile.mkdtemp(), 'keys.sqlite3')
+    started = time.perf_counter()
+    try:
+        if args.processes <= 1:
+            results = []
+            worker(policy, base_url, state_path, args, args.calls, results)
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            queue = ctx.Queue()
+            share = args.calls // args.processes
+            procs = [ctx.Process(target=_run_in_process, args=(policy, base_url, state_path, args, share, queue))
+                     for _ in range(args.processes)]
+            for p in procs:
+                p.start()
+            results = [r for _ in procs for r in queue.get()]
+            for p in procs:
+                p.join()
+    finally:
+        server.shutdown()
+    elapsed = time.perf_counter() - started
+    ok = sorted(r for r in results if r is not None)
+    p50 = statistics.median(ok) if ok else float('nan')
+    p99 = ok[min(len(ok) - 1, int(len(ok) * 0.99))] if ok else float('nan')
+    print(f"{policy:<7} ok={len(ok):<4}/{len(results):<4} upstream={stats['requests']:<5} "
+          f"429s={stats['throttled']:<5} 500s={stats['errors']:<4} p50={p50:7.1f}ms p99={p99:7.1f}ms "
+          f"throughput={len(ok) / elapsed:6.1f}/s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keys', type=int, default=4)
+    parser.add_argument('--key-rps', type=float, default=5.0)
+    parser.add_argument('--key-burst', type=float, default=5.0)
+    parser.add_argument('--headroom', type=float, default=0.95, help='scheduler RPM as a fraction of the true quota')
+    parser.add_argument('--calls', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--wait', type=float, default=2.0, help='GEMINI_KEY_WAIT_SECONDS')
+    parser.add_argument('--work-ms', type=float, default=20.0)
+    parser.add_argument('--slow-ms', type=float, default=200.0)
+    parser.add_argument('--flaky-rate', type=float, default=0.3)
+    parser.add_argument('--policy', choices=['pinned', 'pooled', 'both'], default='both')
+    args = parser.parse_args()
+
+    for policy in (['pinned', 'pooled'] if args.policy == 'both' else [args.policy]):
+        run(policy, args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Duplicate-question lookup: MinHash/LSH index vs a linear SequenceMatcher scan.
+
+    python -m benchmarks.bench_question_index --prior 5000 --queries 200
+
+Prior questions are synthesised from interview-style templates and topics;
+half of the queries are light rewordings of a prior question, half are new.
+"""
+import time
+import random
+import argparse
+from difflib import SequenceMatcher
+
+from backend.question_index import QuestionIndex
+
+TEMPLATES = [
+    "Tell me about a time you {verb} {topic}.",
+    "How would you {verb} {topic} in a production system?",
+    "Can you walk me through how you {verb} {topic}?",
+    "What trade-offs did you consider when you had to {verb} {topic}?",
+    "Describe your approach to {verb} {topic} under a tight deadline.",
+    "What did you learn the last time you had to {verb} {topic}?",
+]
+VERBS = ["design", "debug", "scale", "refactor", "test", "migrate", "monitor", "secure", "optimize", "document"]
+TOPICS = ["a REST API", "a caching layer", "a message queue", "a relational schema", "a CI pipeline",
+          "a React dashboard", "an on-call rotation", "a search feature", "a payment flow", "a data pipeline",
+          "a mobile release", "a legacy monolith", "a feature flag system", "an ML model", "a rate limiter"]
+REWORDS = [("Tell me about", "Tell me about"), ("Can you", "Could you"), ("How would you", "How would you"),
+           ("What trade-offs", "Which trade-offs"), ("Describe", "Please describe")]
+
+def make_question(rng, n):
+    base = rng.choice(TEMPLATES).format(verb=rng.choice(VERBS), topic=rng.choice(TOPICS))
+    return f"{base} (context #{n})" if n % 3 else base
+
+def reword(rng, q):
+    old, new = rng.choice(REWORDS)
+    return q.replace(old, new).rstrip('?.') + "?"
+
+def linear_scan(prior, q, ratio=0.85):
+    ql = q.lower()
+    return any(SequenceMatcher(None, ql, p.lower()).ratio() > ratio for p in prior)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prior', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    prior = [make_question(rng, i) for i in range(args.prior)]
+    queries = [reword(rng, rng.choice(prior)) if i % 2 else
+               f"What motivates you about {rng.choice(['mentoring', 'open source', 'startups', 'research'])} #{i}?"
+               for i in range(args.queries)]
+
+    t0 = time.perf_counter()
+    index = QuestionIndex()
+    for q in prior:
+        index.add(q)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    idx_hits = sum(index.find_duplicate(q) is not None for q in queries)
+    idx_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+
+    t0 = time.perf_counter()
+    scan_hits = sum(linear_scan(prior, q) for q in queries)
+    scan_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+
+    print(f"prior={args.prior} queries={args.queries}")
+    print(f"index build         {build_s * 1000:9.1f}ms total")
+    print(f"minhash/lsh lookup  {idx_ms:9.3f}ms/query  flagged={idx_hits}")
+    print(f"sequencematcher     {scan_ms:9.3f}ms/query  flagged={scan_hits}")
+    print(f"speedup             {scan_ms / idx_ms:9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Cost of the per-turn speaking analytics (decode + vectorised frame analysis).
+
+    python -m benchmarks.bench_speech_metrics --clips 20 --repeat 5
+
+Uses the same synthetic WAV fixtures as bench_stt_pool (16kHz mono, 5-30s).
+"""
+import time
+import argparse
+import tempfile
+import statistics
+
+from backend import speech_metrics
+from benchmarks.bench_stt_pool import build_corpus
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clips', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        paths = build_corpus(corpus_dir, args.clips)
+        decode_ms, analyze_ms, audio_s = [], [], 0.0
+        for _ in range(args.repeat):
+            for path in paths:
+                t0 = time.perf_counter()
+                samples, rate = speech_metrics.decode_pcm(path)
+                t1 = time.perf_counter()
+                result = speech_metrics.analyze_pcm(samples, rate, word_count=120, filler_count=3)
+                t2 = time.perf_counter()
+                decode_ms.append((t1 - t0) * 1000)
+                analyze_ms.append((t2 - t1) * 1000)
+                audio_s += result['duration_ms'] / 1000.0
+
+        total_ms = sum(decode_ms) + sum(analyze_ms)
+        print(f"clips={len(decode_ms)} audio={audio_s:.0f}s")
+        print(f"decode   p50={statistics.median(decode_ms):6.2f}ms  max={max(decode_ms):6.2f}ms")
+        print(f"analyze  p50={statistics.median(analyze_ms):6.2f}ms  max={max(analyze_ms):6.2f}ms")
+        print(f"realtime factor: {audio_s * 1000 / total_ms:,.0f}x")
+        print("sample result:", result)
+
+if __name__ == '__main__':
+    main()
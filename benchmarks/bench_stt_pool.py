@@ -0,0 +1,101 @@
+"""
+Throughput of the transcription process pool at different sizes.
+
+    python -m benchmarks.bench_stt_pool --clips 24 --sizes 1,2,4 [--recognize]
+
+A fixture corpus of WAV clips (16kHz mono, 5-30s, synthetic voiced tones + noise)
+is generated into a temp dir. By default each job does the SpeechRecognition
+record/resample/FLAC work that used to run on the request thread; --recognize also
+calls the Google recognizer (needs network) via services._run_stt.
+"""
+import os
+import math
+import time
+import wave
+import array
+import random
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.stt_pool import TranscriptionPool, TranscriptionBusy
+
+SAMPLE_RATE = 16000
+
+def write_clip(path, seconds, seed):
+    rng = random.Random(seed)
+    samples = array.array('h')
+    f0 = rng.uniform(110, 220)
+    for n in range(int(seconds * SAMPLE_RATE)):
+        t = n / SAMPLE_RATE
+        # syllable-rate envelope, with a ~0.6s pause every 3s like a phrase break
+        envelope = max(0.0, math.sin(2 * math.pi * 3.0 * t)) if t % 3.0 < 2.4 else 0.0
+        value = envelope * (0.6 * math.sin(2 * math.pi * f0 * t) + 0.2 * math.sin(4 * math.pi * f0 * t))
+        value += rng.uniform(-0.05, 0.05)
+        samples.append(int(max(-1.0, min(1.0, value)) * 32767 * 0.5))
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.tobytes())
+
+def build_corpus(directory, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"clip_{i:03d}.wav")
+        write_clip(path, 5 + (i * 7) % 26, seed=i)
+        paths.append(path)
+    return paths
+
+def decode_only(path):
+    # everything recognize_google does before its network call: record, resample, FLAC-encode
+    import speech_recognition as sr
+    with sr.AudioFile(path) as source:
+        audio = sr.Recognizer().record(source)
+    return len(audio.get_flac_data(convert_rate=16000, convert_width=2))
+
+def recognize(path):
+    from backend.services import _run_stt
+    return _run_stt('google', path, None)
+
+def bench(paths, size, job, queue_size, concurrency):
+    pool = TranscriptionPool(workers=size, queue_size=queue_size, timeout=300)
+    rejected = 0
+    lock = threading.Lock()
+
+    def submit(path):
+        nonlocal rejected
+        while True:
+            try:
+                return pool.run(job, path)
+            except TranscriptionBusy:
+                with lock:
+                    rejected += 1
+                time.sleep(0.05)
+
+    pool.run(job, paths[0])  # warm up worker processes
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(submit, paths))
+    elapsed = time.perf_counter() - t0
+    pool.shutdown()
+    print(f"pool={size:<3} clips={len(paths):<4} {elapsed:7.2f}s  {len(paths) / elapsed:6.2f} clips/s  busy-rejections={rejected}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clips', type=int, default=24)
+    parser.add_argument('--sizes', default='1,2,4')
+    parser.add_argument('--queue', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=8, help='simultaneous submitting request threads')
+    parser.add_argument('--recognize', action='store_true')
+    args = parser.parse_args()
+
+    job = recognize if args.recognize else decode_only
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        paths = build_corpus(corpus_dir, args.clips)
+        for size in [int(s) for s in args.sizes.split(',')]:
+            bench(paths, size, job, args.queue, args.concurrency)
+
+if __name__ == '__main__':
+    main()
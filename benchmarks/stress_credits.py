@@ -0,0 +1,115 @@
+"""
+Concurrency stress test for backend/credits.py. Point it at a scratch Postgres
+database (tables are created if missing; the rows it adds are removed after).
+
+    DATABASE_URL=postgresql://.../aic_scratch python -m benchmarks.stress_credits --threads 32 --interviews 200
+
+Rounds, all racing from --threads threads with one session each:
+1. start --interviews interviews for a user holding --free + --paid credits;
+   exactly that many starts must succeed, each charged once, balances at zero
+2. cancel every interview twice over; each started one is refunded exactly once
+3. apply the same payment --threads times (verify + webhook storms); credits granted once
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--interviews', type=int, default=200)
+    parser.add_argument('--free', type=int, default=2)
+    parser.add_argument('--paid', type=int, default=50)
+    parser.add_argument('--grant', type=int, default=2)
+    args = parser.parse_args()
+    if not os.getenv('DATABASE_URL'):
+        parser.error("set DATABASE_URL to a scratch database")
+
+    from backend.app import create_app, db
+    from backend.models import User, Interview, Payment
+    from backend import credits
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email=f"stress-{int(time.time() * 1000)}@example.invalid", password_hash='x',
+                    free_interviews_remaining=args.free, paid_interviews_remaining=args.paid)
+        db.session.add(user)
+        db.session.flush()
+        interviews = [Interview(user_id=user.id, mode='normal') for _ in range(args.interviews)]
+        db.session.add_all(interviews)
+        payment = Payment(user_id=user.id, razorpay_order_id=f"order_stress_{user.id}", amount=100)
+        db.session.add(payment)
+        db.session.commit()
+        user_id, interview_ids, order_id = user.id, [i.id for i in interviews], payment.razorpay_order_id
+
+    def in_session(fn):
+        def run(arg):
+            with app.app_context():
+                try:
+                    result = fn(arg)
+                    db.session.commit()
+                    return result
+                except Exception:
+                    db.session.rollback()
+                    raise
+        return run
+
+    def race(label, fn, items):
+        barrier = threading.Barrier(min(args.threads, len(items)))
+
+        def first_wait(arg):
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            return fn(arg)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            results = list(pool.map(in_session(first_wait), items))
+        elapsed = time.perf_counter() - started
+        print(f"{label:<8} {len(items):>5} ops in {elapsed:6.2f}s ({len(items) / elapsed:8.1f} ops/s)")
+        return results
+
+    def balances():
+        with app.app_context():
+            u = db.session.get(User, user_id)
+            return u.free_interviews_remaining, u.paid_interviews_remaining
+
+    failures = []
+
+    def check(cond, message):
+        print(("ok    " if cond else "FAIL  ") + message)
+        if not cond:
+            failures.append(message)
+
+    starts = race('start', lambda iid: credits.start_interview(iid, user_id), interview_ids)
+    charged = [s for s in starts if s in ('free', 'paid')]
+    expected = min(args.interviews, args.free + args.paid)
+    check(len(charged) == expected, f"{len(charged)} starts charged, expected {expected}")
+    check(charged.count('free') == min(args.free, expected), f"{charged.count('free')} free credits used")
+    free, paid = balances()
+    check(free >= 0 and paid >= 0, f"balances never negative (free={free}, paid={paid})")
+    check(free + paid == args.free + args.paid - expected, "balance matches the charges")
+
+    cancels = race('cancel', lambda iid: credits.cancel_interview(iid, user_id), interview_ids * 2)
+    check(cancels.count('refunded') == expected, f"{cancels.count('refunded')} refunds, expected {expected}")
+    check(balances() == (args.free, args.paid), f"balances restored to {balances()}")
+
+    grants = race('payment', lambda _: credits.apply_payment(order_id, 'pay_stress', args.grant),
+                  range(args.threads))
+    check(sum(1 for g in grants if g) == 1, "payment applied exactly once")
+    check(balances()[1] == args.paid + args.grant, f"paid balance {balances()[1]}")
+
+    with app.app_context():
+        Interview.query.filter_by(user_id=user_id).delete()
+        Payment.query.filter_by(user_id=user_id).delete()
+        User.query.filter_by(id=user_id).delete()
+        db.session.commit()
+    raise SystemExit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect } from 'react';
 import { useAuth } from '../AuthContext';
 import { useNavigate } from 'react-router-dom';
 import { motion } from 'framer-motion';
@@ -33,6 +33,7 @@ function Stat({ icon: Icon, label, value, hint, gradient }) {
 export default function DashboardPage() {
   const { user, logout } = useAuth();
   const [history, setHistory] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const navigate = useNavigate();
 
@@ -43,8 +44,13 @@ export default function DashboardPage() {
   useEffect(() => {
     const fetchHistory = async () => {
       try {
-        const { data } = await api.get('/interviews/history');
+        // totals come from the server so they cover every session, not just the listed page
+        const [{ data }, { data: totals }] = await Promise.all([
+          api.get('/interviews/history', { params: { summary: 1, limit: 100 } }),
+          api.get('/interviews/history/stats'),
+        ]);
         setHistory(Array.isArray(data) ? data : []);
+        setStats(totals);
       } catch (e) {
         console.error(e);
       } finally {
@@ -54,11 +60,9 @@ export default function DashboardPage() {
     if (user) fetchHistory();
   }, [user]);
 
-  const bestScore = useMemo(() => (history.length ? Math.max(...history.map(h => h.overall_score || 0)) : 0), [history]);
-  const avgScore = useMemo(() => {
-    const scores = history.map(h => h.overall_score).filter(Boolean);
-    return scores.length ? (scores.reduce((a, b) => a + b, 0) / scores.length) : 0;
-  }, [history]);
+  const completed = stats?.completed ?? history.length;
+  const bestScore = stats?.best_score || 0;
+  const avgScore = stats?.average_score || 0;
 
   const scoreTone = (s) => (s >= 8.5 ? 'text-emerald-300' : s >= 7 ? 'text-amber-300' : s >= 5 ? 'text-orange-300' : 'text-rose-300');
 
@@ -74,9 +78,9 @@ export default function DashboardPage() {
         {/* Stats */}
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-4 mb-8">
           <Stat icon={CreditCard} label="Total Credits" value={total} hint={`${free} free • ${paid} paid`} gradient="from-[#3b82f6]/25 to-[#8b5cf6]/25" />
-          <Stat icon={CalendarDays} label="Sessions Completed" value={history.length} hint="Practice makes perfect" gradient="from-[#10b981]/25 to-[#22d3ee]/25" />
+          <Stat icon={CalendarDays} label="Sessions Completed" value={completed} hint="Practice makes perfect" gradient="from-[#10b981]/25 to-[#22d3ee]/25" />
           <Stat icon={Trophy} label="Best Score" value={`${bestScore ? bestScore.toFixed(1) : '—'}/10`} hint="Personal record" gradient="from-[#f59e0b]/25 to-[#ef4444]/25" />
-          <Stat icon={Star} label="Avg Score" value={`${avgScore ? avgScore.toFixed(1) : '—'}/10`} hint="Last 30 days" gradient="from-[#f472b6]/25 to-[#22c55e]/25" />
+          <Stat icon={Star} label="Avg Score" value={`${avgScore ? avgScore.toFixed(1) : '—'}/10`} hint="Across all sessions" gradient="from-[#f472b6]/25 to-[#22c55e]/25" />
         </div>
 
         {/* Quick Actions */}
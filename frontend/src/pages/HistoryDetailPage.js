@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import api from '../api';
+import { waitForJob } from '../utils/pollJob';
 import { Page, Container } from '../components/Page';
 import GlassCard from '../components/GlassCard';
 import { PrimaryButton } from '../components/Buttons';
@@ -12,13 +13,31 @@ export default function HistoryDetailPage() {
   const [data, setData] = useState(null);
   const [paywalled, setPaywalled] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [suggestionsState, setSuggestionsState] = useState(null); // 'pending' | 'failed' | null
 
   useEffect(() => {
+    const controller = new AbortController();
+    const fetchDetail = () => api.get('/interviews/detail', { params: { session_id: id } });
     const run = async () => {
       try {
-        const res = await api.get('/interviews/detail', { params: { session_id: id } });
+        const res = await fetchDetail();
         setData(res.data);
         setPaywalled(null);
+        if (!res.data.suggestions && res.data.suggestions_job_id) {
+          // suggestions are still being generated by the job worker
+          setSuggestionsState('pending');
+          setLoading(false);
+          try {
+            await waitForJob(api, res.data.suggestions_job_id, { signal: controller.signal });
+            const again = await fetchDetail();
+            if (!controller.signal.aborted) {
+              setData(again.data);
+              setSuggestionsState(null);
+            }
+          } catch {
+            if (!controller.signal.aborted) setSuggestionsState('failed');
+          }
+        }
       } catch (err) {
         if (err?.response?.status === 402) {
           setPaywalled(err.response.data || { error: 'Upgrade required.' });
@@ -28,6 +47,7 @@ export default function HistoryDetailPage() {
       }
     };
     run();
+    return () => controller.abort();
   }, [id]);
 
   if (loading) {
@@ -99,6 +119,14 @@ export default function HistoryDetailPage() {
         </GlassCard>
 
         {/* Suggestions */}
+        {suggestionsState === 'pending' && (
+          <div className="text-center text-white/60 text-sm">Preparing your pro suggestions…</div>
+        )}
+        {suggestionsState === 'failed' && (
+          <div className="text-center text-rose-300 text-sm">
+            Suggestions couldn’t be generated. Reload the page to try again.
+          </div>
+        )}
         <div className="grid grid-cols-1 lg:grid-cols-3 gap-6">
           <GlassCard className="p-6">
             <div className="flex items-center gap-2 mb-3">
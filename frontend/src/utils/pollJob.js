@@ -0,0 +1,25 @@
+// frontend/src/utils/pollJob.js
+// Background jobs (post-session suggestions): /interviews/detail carries a
+// suggestions_job_id until the suggestions are ready; wait on it, then refetch.
+export function waitForJob(api, jobId, {
+  interval = 2000,   // between polls of /interviews/jobs/<id>
+  timeout = 120000,  // give up after 2 min
+  signal             // AbortSignal, e.g. from a useEffect cleanup
+} = {}) {
+  const deadline = Date.now() + timeout;
+  return new Promise((resolve, reject) => {
+    const poll = async () => {
+      if (signal?.aborted) return reject(new Error('Polling aborted'));
+      try {
+        const { data } = await api.get(`/interviews/jobs/${jobId}`);
+        if (data.status === 'succeeded') return resolve(data);
+        if (data.status === 'failed') return reject(new Error(data.error || 'Job failed'));
+      } catch (err) {
+        return reject(err);
+      }
+      if (Date.now() > deadline) return reject(new Error('Timed out waiting for job'));
+      setTimeout(poll, interval);
+    };
+    poll();
+  });
+}